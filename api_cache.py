@@ -0,0 +1,94 @@
+"""On-disk cache of ERR API responses with conditional revalidation."""
+
+import json
+import os
+import threading
+import time
+from typing import Dict, Optional
+from loguru import logger
+
+
+class ApiResponseCache:
+    """Stores getContentPageData responses per content ID with their ETag/Last-Modified.
+
+    Entries younger than ttl seconds are served without contacting the API; older
+    ones are revalidated with a conditional GET so an unchanged page costs a 304.
+    Each entry is its own file, replaced atomically, so concurrent workers never
+    rewrite each other's data. Entries not used for max_age seconds (series that
+    left the config, seasons nobody asks for) are deleted when the cache opens.
+    """
+
+    def __init__(self, directory: str, ttl: float = 0, max_age: float = 0):
+        self.directory = os.path.expanduser(directory)
+        self.ttl = ttl
+        self.max_age = max_age
+        os.makedirs(self.directory, exist_ok=True)
+        self.prune()
+
+    def prune(self) -> None:
+        """Delete entries that were neither stored nor revalidated for max_age seconds."""
+        if self.max_age <= 0:
+            return
+
+        cutoff = time.time() - self.max_age
+        removed = 0
+        try:
+            with os.scandir(self.directory) as entries:
+                for entry in entries:
+                    if entry.name.endswith(".json") and entry.stat().st_mtime < cutoff:
+                        os.remove(entry.path)
+                        removed += 1
+        except OSError as e:
+            logger.debug(f"Failed to prune API cache: {e}")
+        if removed:
+            logger.info(f"Removed {removed} unused API cache entries from {self.directory}")
+
+    def _path(self, content_id: int) -> str:
+        """Get the entry file of a content ID."""
+        return os.path.join(self.directory, f"{content_id}.json")
+
+    def get(self, content_id: int) -> Optional[Dict]:
+        """Return the stored entry ({data, etag, last_modified, fetched_at}) or None."""
+        try:
+            with open(self._path(content_id), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+        except (json.JSONDecodeError, IOError) as e:
+            logger.debug(f"Ignoring unreadable API cache entry for {content_id}: {e}")
+            return None
+
+    def is_fresh(self, entry: Dict) -> bool:
+        """Check if an entry may be served without revalidation."""
+        return self.ttl > 0 and time.time() - entry.get("fetched_at", 0) < self.ttl
+
+    @staticmethod
+    def conditional_headers(entry: Optional[Dict]) -> Dict[str, str]:
+        """Build If-None-Match/If-Modified-Since headers for revalidating an entry."""
+        headers = {}
+        if entry:
+            if entry.get("etag"):
+                headers["If-None-Match"] = entry["etag"]
+            if entry.get("last_modified"):
+                headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def store(self, content_id: int, data: Dict, etag: Optional[str], last_modified: Optional[str]) -> None:
+        """Store a fresh response."""
+        self._write(content_id, {"data": data, "etag": etag, "last_modified": last_modified, "fetched_at": time.time()})
+
+    def touch(self, content_id: int, entry: Dict) -> None:
+        """Mark an entry as revalidated (after a 304)."""
+        entry["fetched_at"] = time.time()
+        self._write(content_id, entry)
+
+    def _write(self, content_id: int, entry: Dict) -> None:
+        """Atomically replace the entry file; the temp name is unique per thread."""
+        path = self._path(content_id)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(entry, f, ensure_ascii=False)
+            os.replace(tmp_path, path)
+        except IOError as e:
+            logger.debug(f"Failed to store API cache entry for {content_id}: {e}")
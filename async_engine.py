@@ -0,0 +1,490 @@
+"""Asyncio download engine, selected with threading.engine: asyncio.
+
+Runs every metadata request and transfer of a run on one event loop instead of a
+thread per in-flight download. Parsing, file naming, the cache and statistics are
+shared with the thread-based engine.
+"""
+
+import asyncio
+import os
+import time
+from typing import Dict, List, Optional, Set, Tuple
+
+import aiohttp
+from loguru import logger
+from tenacity import retry, stop_after_attempt, wait_exponential, retry_if_exception_type, retry_if_exception
+from tqdm import tqdm
+
+import err_api
+from settings import settings
+from rate_limit import RETRY_AFTER_STATUSES, parse_retry_after
+from api_cache import ApiResponseCache
+from err_api import (
+    api_cache,
+    api_limiter,
+    attach_season_contents,
+    bandwidth,
+    collect_episode_metadata,
+    details_from_metadata,
+    extract_show_slug,
+    extract_video_id,
+    find_season_contents,
+    get_file_paths,
+    get_season_episode_ids,
+    get_season_first_ids,
+    parse_series_data,
+    parse_video_details,
+    remember_http_error,
+    remember_missing_media,
+    remembered_missing,
+    reuse_known_seasons,
+    should_skip_download,
+    transfers,
+)
+from discovery import add_discovered_urls
+from negative_cache import GEO_RESTRICTED, REMOVED
+from disk_io import IoStats, open_download_file, run_io_stats
+from run_metrics import count_retry, episode_scope, run_metrics
+from integrity import StreamVerifier
+from partial import accept_response, commit, is_complete, part_path, partial_size, resume_headers
+from downloader import (
+    cache,
+    create_stats,
+    download_queue,
+    finish_run,
+    get_content_type,
+    finish_queued_episode,
+    get_known_seasons,
+    get_season_id_collector,
+    queue_drm_rechecks,
+    queue_series,
+    queue_single_video,
+    queued_video_info,
+    record_url_failure,
+    take_queued_episode,
+)
+
+NETWORK_ERRORS = (aiohttp.ClientError, asyncio.TimeoutError)
+
+
+def _is_retryable_error(exception: BaseException) -> bool:
+    """Check if exception is a server-side (5xx) or rate limit (429) HTTP error."""
+    return isinstance(exception, aiohttp.ClientResponseError) and (exception.status >= 500 or exception.status == 429)
+
+
+def _resume_state(file_path: str) -> Tuple[int, bool, Dict[str, str]]:
+    """Read the .part file and its sidecar: (existing size, already complete, resume headers)."""
+    existing_size = partial_size(file_path)
+    return existing_size, is_complete(file_path, existing_size), resume_headers(file_path, existing_size)
+
+
+def _keep_partial(episode_id: Optional[int], part_file: str, mp4_url: str) -> None:
+    """Remember an unfinished download so a later attempt resumes it."""
+    if os.path.exists(part_file):
+        logger.warning(f"Keeping partial file for the next attempt: {part_file}")
+        if episode_id:
+            transfers.record(episode_id, part_file, mp4_url)
+
+
+class AsyncEngine:
+    """Coroutine versions of the ERR API and download functions sharing one HTTP session.
+
+    Everything that touches the disk (state files, the cache, folder scans on the
+    media mount, .part files) runs in the default executor through
+    asyncio.to_thread, so a slow mount never stalls the other transfers.
+    """
+
+    def __init__(self, session: aiohttp.ClientSession):
+        self.session = session
+        self.api_slots = asyncio.Semaphore(settings.threading.async_api_concurrency)
+        # URL resolution fills the download queue while drain_queue empties it
+        self.resolving = False
+        self.queue_changed = asyncio.Event()
+
+    @retry(
+        stop=stop_after_attempt(3),
+        wait=wait_exponential(multiplier=1, min=2, max=30),
+        retry=retry_if_exception(_is_retryable_error),
+        before_sleep=count_retry("api"),
+        reraise=True,
+    )
+    async def fetch_content_page(self, content_id: int, cached: bool = True) -> dict:
+        """Fetch getContentPageData with retry on 5xx/429 errors, shared rate limiting and (unless cached is off) the response cache."""
+        response_cache = api_cache if cached else None
+        entry = await asyncio.to_thread(response_cache.get, content_id) if response_cache else None
+        if entry and response_cache.is_fresh(entry):
+            logger.debug(f"API cache hit for content_id: {content_id}")
+            return entry["data"]
+
+        url = err_api.API_BASE_URL.format(content_id)
+        headers = ApiResponseCache.conditional_headers(entry)
+        async with self.api_slots:
+            await api_limiter.acquire_async()
+            started = time.perf_counter()
+            run_metrics.count("api_requests")
+            async with self.session.get(url, headers=headers, timeout=aiohttp.ClientTimeout(total=settings.download.timeout_max)) as response:
+                run_metrics.observe("api_latency_seconds", time.perf_counter() - started)
+                if response.status in RETRY_AFTER_STATUSES:
+                    retry_after = parse_retry_after(response.headers.get("Retry-After"))
+                    if retry_after:
+                        logger.warning(f"API asks to back off for {retry_after:.0f}s (HTTP {response.status})")
+                        api_limiter.pause(retry_after)
+                response.raise_for_status()
+
+                if response.status == 304 and entry:
+                    logger.debug(f"API response not modified for content_id: {content_id}")
+                    await asyncio.to_thread(response_cache.touch, content_id, entry)
+                    return entry["data"]
+
+                data = await response.json(content_type=None)
+                if response_cache:
+                    await asyncio.to_thread(response_cache.store, content_id, data, response.headers.get("ETag"), response.headers.get("Last-Modified"))
+                return data
+
+    async def fetch_video_api_data(self, content_id: int) -> Optional[dict]:
+        """Fetch raw video data from ERR API, unless the content ID is remembered as missing."""
+        if remembered_missing(content_id):
+            return None
+
+        try:
+            logger.info(f"Fetching video details for content_id: {content_id}")
+            return await self.fetch_content_page(content_id, cached=False)
+        except aiohttp.ClientResponseError as e:
+            await asyncio.to_thread(remember_http_error, content_id, e.status)
+            if e.status == 404:
+                logger.warning(f"Sisu ei ole enam saadaval ERRis (404) - ID: {content_id}. Sisu on tõenäoliselt ERRist eemaldatud või arhiveeritud.")
+            else:
+                logger.error(f"HTTP error {e.status}: {str(e)}")
+            return None
+        except NETWORK_ERRORS as e:
+            logger.error(f"Network error: {str(e)}")
+            return None
+        except ValueError as e:
+            logger.error(f"Invalid JSON response: {str(e)}")
+            return None
+
+    async def get_video_details(
+        self, content_id: int, content_type: str, metadata: Optional[dict] = None
+    ) -> Tuple[Optional[str], Optional[str], Optional[str]]:
+        """Fetch and parse video details from ERR API, unless the series response already provided them."""
+        details = details_from_metadata(metadata, content_id, content_type)
+        if details:
+            logger.debug(f"Using series listing metadata for content_id: {content_id}")
+            return details
+
+        data = await self.fetch_video_api_data(content_id)
+        if not data:
+            return None, None, None
+
+        await asyncio.to_thread(remember_missing_media, content_id, data)
+        return parse_video_details(data, content_id, content_type)
+
+    async def get_all_episodes_from_series(
+        self,
+        series_id: int,
+        season_ids: Optional[Set[int]] = None,
+        episode_metadata: Optional[Dict[int, dict]] = None,
+        seasons: Optional[Dict[int, List[int]]] = None,
+    ) -> Tuple[Optional[str], List[int]]:
+        """Get all episode IDs from a series. Returns (series_name, episode_ids)."""
+        reason = remembered_missing(series_id, (REMOVED, GEO_RESTRICTED))
+        if reason:
+            return (settings.constants.content_not_found_404 if reason == REMOVED else None), []
+
+        url = err_api.API_BASE_URL.format(series_id)
+        try:
+            logger.info(f"Fetching series data for ID: {series_id}")
+            data = await self.fetch_content_page(series_id)
+            if season_ids is not None:
+                season_ids.update(get_season_first_ids(data))
+            await self.expand_lazy_seasons(data, seasons)
+            if episode_metadata is not None:
+                episode_metadata.update(collect_episode_metadata(data, series_id))
+            if seasons is not None:
+                seasons.clear()
+                seasons.update(get_season_episode_ids(data))
+            return parse_series_data(data)
+        except aiohttp.ClientResponseError as e:
+            await asyncio.to_thread(remember_http_error, series_id, e.status)
+            if e.status == 404:
+                logger.warning(
+                    f"Sarja ei ole enam saadaval ERRis ({settings.constants.content_not_found_404}) - ID: {series_id}. Sari {url} on tõenäoliselt ERRist eemaldatud või arhiveeritud."
+                )
+                return settings.constants.content_not_found_404, []
+            logger.error(f"Failed to get series data: HTTP error {e.status}: {str(e)}")
+            return None, []
+        except NETWORK_ERRORS as e:
+            logger.error(f"Failed to get series data: {str(e)}")
+            return None, []
+        except (ValueError, KeyError) as e:
+            logger.error(f"Failed to parse series data: {str(e)}")
+            return None, []
+
+    async def expand_lazy_seasons(self, data: dict, known_seasons: Optional[Dict[int, List[int]]] = None) -> None:
+        """Fetch seasons that only carry firstContentId so every episode is enumerated in one pass."""
+        if not settings.download.expand_seasons:
+            return
+        first_ids = reuse_known_seasons(data, known_seasons)
+        if not first_ids:
+            return
+
+        logger.info(f"Fetching {len(first_ids)} seasons listed without episodes")
+
+        async def fetch_season(first_id: int) -> Optional[List[dict]]:
+            try:
+                return find_season_contents(await self.fetch_content_page(first_id), first_id)
+            except NETWORK_ERRORS + (ValueError,) as e:
+                logger.warning(f"Failed to fetch season starting at ID {first_id}: {str(e)}")
+                return None
+
+        results = await asyncio.gather(*(fetch_season(first_id) for first_id in first_ids))
+        attach_season_contents(data, {first_id: contents for first_id, contents in zip(first_ids, results) if contents})
+
+    @retry(
+        stop=stop_after_attempt(settings.retry.max_attempts),
+        wait=wait_exponential(multiplier=settings.retry.wait_multiplier, min=settings.retry.wait_min, max=settings.retry.wait_max),
+        retry=retry_if_exception_type(NETWORK_ERRORS + (IOError,)),
+        before_sleep=count_retry("download"),
+    )
+    async def download_file_with_progress(self, url: str, file_path: str, file_title: str) -> Tuple[int, Optional[str]]:
+        """Download file from URL into the .part file file_path with resume support. Returns (size, sha256) of the verified file."""
+        try:
+            existing_size, complete, headers = await asyncio.to_thread(_resume_state, file_path)
+            if complete:
+                logger.info("Partial file is already complete")
+                verifier = await asyncio.to_thread(StreamVerifier.from_prefix, file_path, existing_size, existing_size, settings.download.verify_hash)
+                return verifier.size, verifier.digest
+
+            if existing_size > 0:
+                logger.info(f"Resuming from {existing_size / (1024 * 1024):.1f} MB")
+
+            timeout = aiohttp.ClientTimeout(total=None, sock_connect=10, sock_read=30)
+            requested = time.perf_counter()
+            async with self.session.get(url, headers=headers, timeout=timeout) as response:
+                run_metrics.observe("ttfb_seconds", time.perf_counter() - requested)
+                response.raise_for_status()
+                existing_size, total = await asyncio.to_thread(accept_response, file_path, existing_size, response.status, response.headers)
+
+                mode = "ab" if existing_size > 0 else "wb"
+                verifier = await asyncio.to_thread(StreamVerifier.from_prefix, file_path, existing_size, total, settings.download.verify_hash)
+
+                io_stats = IoStats()
+                started = time.perf_counter()
+
+                # Opening, writing and the final buffer flush on close all go to the executor
+                file = await asyncio.to_thread(open_download_file, file_path, mode, settings.download.write_buffer, io_stats, settings.download.fadvise)
+                try:
+                    with tqdm(total=total, initial=existing_size, unit="B", unit_scale=True, desc=file_title) as pbar:
+                        async for chunk in response.content.iter_chunked(settings.download.chunk_size):
+                            io_stats.reads += 1
+                            await asyncio.to_thread(file.write, chunk)
+                            verifier.update(chunk)
+                            pbar.update(len(chunk))
+                            await bandwidth.consume_async(len(chunk))
+                finally:
+                    await asyncio.to_thread(file.close)
+
+                io_stats.bytes = verifier.size - existing_size
+                io_stats.seconds = time.perf_counter() - started
+                run_io_stats.merge(io_stats)
+                run_metrics.transfer(io_stats.bytes, io_stats.seconds)
+                run_metrics.observe("write_seconds", io_stats.write_seconds)
+                logger.info(f"Wrote {io_stats.describe()}")
+
+            verifier.verify()
+            return verifier.size, verifier.digest
+        except NETWORK_ERRORS as e:
+            logger.error(f"Download failed - Network error: {str(e)}")
+            raise
+        except IOError as e:
+            logger.error(f"Download failed - File error: {str(e)}")
+            raise
+
+    async def download_mp4(
+        self, heading: str, file_title: str, mp4_url: str, content_type: str, skip_existing: bool = True, episode_id: Optional[int] = None
+    ) -> tuple | str | bool:
+        """Download MP4 file. Returns the same results as err_api.download_mp4."""
+        final_folder_path, final_file_path = get_file_paths(heading, file_title, content_type)
+
+        if await asyncio.to_thread(should_skip_download, final_file_path, file_title, heading, skip_existing):
+            return (settings.constants.download_skipped, final_file_path)
+
+        logger.info(f"Starting download: [{heading}] {file_title}")
+
+        await asyncio.to_thread(os.makedirs, final_folder_path, exist_ok=True)
+        part_file = part_path(final_file_path)
+        if episode_id:
+            await asyncio.to_thread(transfers.adopt, episode_id, part_file)
+
+        try:
+            size, digest = await self.download_file_with_progress(mp4_url, part_file, file_title)
+            await asyncio.to_thread(commit, part_file, final_file_path)
+            if episode_id:
+                await asyncio.to_thread(transfers.remove, episode_id)
+            logger.success(f"Download completed: [{heading}] {file_title}")
+            return ("success", final_file_path, size, digest)
+        except Exception:
+            await asyncio.to_thread(_keep_partial, episode_id, part_file, mp4_url)
+            return False
+
+    async def prepare_download(
+        self, video_content_id: int, content_type: str, series_name: Optional[str] = None, metadata: Optional[dict] = None
+    ) -> Tuple[str, str, str] | str | bool:
+        """Resolve a video to (folder, file title, MP4 URL). Returns drm_protected or False if it cannot be downloaded."""
+        if not isinstance(video_content_id, int) or video_content_id <= 0:
+            logger.error("Invalid video content ID")
+            return False
+
+        folder_name, file_name, video_url = await self.get_video_details(video_content_id, content_type, metadata)
+
+        if folder_name == settings.constants.drm_protected:
+            return settings.constants.drm_protected
+
+        if all((folder_name, file_name, video_url)):
+            return (series_name if series_name else folder_name, file_name, video_url)  # type: ignore
+
+        logger.error(f"Failed to get video details for ID: {video_content_id}")
+        return False
+
+    async def drain_queue(self, stats: Dict) -> None:
+        """Download queued episodes in priority order, looking episodes up ahead of the transfers (see downloader.drain_queue).
+
+        While URLs are still being resolved, an empty queue makes the metadata
+        workers wait for queue_changed instead of stopping.
+        """
+        if not len(download_queue) and not self.resolving:
+            return
+
+        transfer_workers = settings.threading.get_max_workers()
+        metadata_workers = max(settings.threading.metadata_workers, 1)
+        prepared: asyncio.Queue = asyncio.Queue(maxsize=max(settings.threading.prefetch, 1))
+
+        logger.info("=" * 80)
+        queued = f"queued episodes ({len(download_queue)} so far)" if self.resolving else f"{len(download_queue)} queued episodes"
+        logger.info(f"Downloading {queued} with {transfer_workers} transfer and {metadata_workers} metadata workers")
+
+        async def metadata_worker() -> None:
+            while True:
+                # Cleared before looking, so a push right after an empty look still wakes this worker
+                self.queue_changed.clear()
+                queued = await asyncio.to_thread(take_queued_episode, stats)
+                if queued is None:
+                    if not self.resolving:
+                        return
+                    await self.queue_changed.wait()
+                    continue
+                ep_id, item = queued
+                try:
+                    with episode_scope(ep_id):
+                        details = await self.prepare_download(ep_id, item["content_type"], item["series_name"], item.get("metadata"))
+                except Exception as e:
+                    logger.error(f"Failed to look up {queued_video_info(ep_id, item)}: {str(e)}")
+                    details = False
+
+                if isinstance(details, tuple):
+                    await prepared.put((ep_id, item, details))
+                else:
+                    await asyncio.to_thread(finish_queued_episode, ep_id, item, details, stats)
+
+        async def transfer_worker() -> None:
+            while (entry := await prepared.get()) is not None:
+                ep_id, item, details = entry
+                result = False
+                try:
+                    with episode_scope(ep_id):
+                        result = await self.download_mp4(*details, item["content_type"], settings.download.skip_existing, ep_id)
+                except Exception as e:
+                    logger.error(f"Download failed: {queued_video_info(ep_id, item)}: {str(e)}")
+                await asyncio.to_thread(finish_queued_episode, ep_id, item, result, stats)
+
+        async def run_lookups() -> None:
+            try:
+                await asyncio.gather(*(metadata_worker() for _ in range(metadata_workers)))
+            finally:
+                for _ in range(transfer_workers):
+                    await prepared.put(None)
+
+        await asyncio.gather(run_lookups(), *(transfer_worker() for _ in range(transfer_workers)))
+
+    async def process_url(self, url: str, content_type: str, stats: Dict, processed_slugs: set, discovered: Optional[Dict[str, Set[int]]] = None) -> None:
+        """Process a single URL for download."""
+        logger.info("=" * 80)
+        logger.success(f"Processing URL: {url}")
+
+        video_id = extract_video_id(url)
+        if not video_id:
+            logger.error("Failed to extract video ID")
+            record_url_failure(stats, f"URL: {url} (failed to extract video ID)")
+            return
+
+        if not settings.download.download_all_episodes:
+            logger.info("Downloading single video")
+            await asyncio.to_thread(queue_single_video, video_id, content_type, f"Video ID {video_id} from {url}", stats)
+            self.queue_changed.set()
+            return
+
+        slug = extract_show_slug(url)
+        if slug and slug in processed_slugs:
+            logger.info(f"[{slug}] Sari juba töödeldud, vahele jäetud (duplikaat-URL)")
+            return
+
+        logger.info("Fetching all episodes from series...")
+        episode_metadata: Dict[int, dict] = {}
+        seasons = get_known_seasons(video_id)
+        series_name, episode_ids = await self.get_all_episodes_from_series(
+            video_id, get_season_id_collector(discovered, slug, content_type), episode_metadata, seasons
+        )
+        await asyncio.to_thread(queue_series, url, video_id, slug, content_type, stats, processed_slugs, series_name, episode_ids, episode_metadata, seasons)
+        self.queue_changed.set()
+
+    async def process_urls(self, urls: List[str], stats: Dict, discovered: Optional[Dict[str, Set[int]]] = None) -> None:
+        """Resolve all URLs at once (URLs of the same show in config order) while downloading what they queue."""
+        processed_slugs: set = set()
+        groups: Dict[str, List[str]] = {}
+        for url in urls:
+            groups.setdefault(extract_show_slug(url) or url, []).append(url)
+
+        async def process_group(group: List[str]) -> None:
+            for url in group:
+                await self.process_url(url, get_content_type(url), stats, processed_slugs, discovered)
+
+        async def resolve() -> None:
+            try:
+                await asyncio.gather(*(process_group(group) for group in groups.values()))
+                await asyncio.to_thread(queue_drm_rechecks)
+            finally:
+                self.resolving = False
+                self.queue_changed.set()
+
+        self.resolving = True
+        await asyncio.gather(resolve(), self.drain_queue(stats))
+
+
+async def _run(urls: List[str], stats: Dict, discovered: Optional[Dict[str, Set[int]]]) -> None:
+    """Open the shared HTTP session and process every URL on it."""
+    connector = aiohttp.TCPConnector(limit=settings.threading.async_api_concurrency + settings.threading.get_max_workers())
+    async with aiohttp.ClientSession(connector=connector, headers={"Accept-Encoding": "gzip, deflate"}) as session:
+        await AsyncEngine(session).process_urls(urls, stats, discovered)
+
+
+def run_async_download_mode(discover: bool = False) -> int:
+    """Run download mode on the asyncio engine, optionally adding discovered season URLs to the config."""
+    all_urls = settings.tv_shows + settings.movies
+    logger.info(f"Total URLs to process: {len(all_urls)} (TV Shows: {len(settings.tv_shows)}, Movies: {len(settings.movies)}) [asyncio]")
+
+    stats = create_stats()
+    discovered: Optional[Dict[str, Set[int]]] = {} if discover else None
+
+    try:
+        asyncio.run(_run(all_urls, stats, discovered))
+        finish_run(stats)
+
+        if discovered is not None:
+            add_discovered_urls(discovered)
+    except Exception as e:
+        logger.error(f"Critical error: {str(e)}")
+        return 1
+    finally:
+        cache.flush()
+
+    return 0
@@ -2,40 +2,171 @@
 
 import json
 import os
-from typing import Dict, Optional
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Iterable, Optional, Tuple, Union
 from loguru import logger
 
+from journal import Journal
+
+
+class FileVerifier:
+    """Answers "does this cached file still exist, and how big is it".
+
+    With scan_ttl set, each folder is listed once with os.scandir and all lookups in
+    it are served from that listing until it is scan_ttl seconds old, which turns
+    thousands of per-file stats on a network mount into one listing per show.
+    Without it every lookup stats the file directly.
+    """
+
+    def __init__(self, scan_ttl: Optional[float] = None):
+        self.scan_ttl = scan_ttl
+        self._folders: Dict[str, Tuple[float, Dict[str, int]]] = {}
+        self._lock = threading.Lock()
+
+    def file_size(self, file_path: str) -> Optional[int]:
+        """Return the size of file_path, or None if it does not exist."""
+        if self.scan_ttl is None:
+            try:
+                return os.path.getsize(file_path)
+            except OSError:
+                return None
+
+        folder, name = os.path.split(file_path)
+        with self._lock:
+            entry = self._folders.get(folder)
+        if entry is None or time.monotonic() - entry[0] > self.scan_ttl:
+            entry = (time.monotonic(), self._scan(folder))
+            with self._lock:
+                self._folders[folder] = entry
+        return entry[1].get(name)
+
+    def record(self, file_path: str) -> None:
+        """Refresh a single entry of an already scanned folder after a file was written."""
+        if self.scan_ttl is None:
+            return
+
+        folder, name = os.path.split(file_path)
+        with self._lock:
+            entry = self._folders.get(folder)
+            if entry is None:
+                return
+            try:
+                entry[1][name] = os.path.getsize(file_path)
+            except OSError:
+                entry[1].pop(name, None)
+
+    @staticmethod
+    def _scan(folder: str) -> Dict[str, int]:
+        """List regular files in folder with their sizes."""
+        sizes: Dict[str, int] = {}
+        try:
+            with os.scandir(folder) as entries:
+                for entry in entries:
+                    if entry.is_file():
+                        sizes[entry.name] = entry.stat().st_size
+        except OSError as e:
+            logger.debug(f"Failed to scan {folder}: {e}")
+        return sizes
+
 
 class DownloadCache:
-    """Cache for tracking downloaded episodes with file path verification."""
+    """Cache for tracking downloaded episodes with file path verification.
+
+    State is a JSON snapshot plus an append-only journal holding one record per
+    mutation. The journal is replayed on load and compacted into the snapshot once
+    it reaches compact_threshold records, so a mark costs one short append instead
+    of rewriting the whole file. Size and SHA-256 of verified downloads are kept in
+    a separate "meta" map so the paths map stays readable by older versions.
+
+    All methods are safe to call from worker threads. Journal writes go through a
+    single open handle and every record is flushed to the OS as it is written, so
+    a killed process loses nothing; only a power loss can cost the unsynced tail,
+    which merely means re-checking files that are already on disk.
+    """
 
-    def __init__(self, cache_file: str):
+    DRM_MARKER = "DRM_PROTECTED"
+    JOURNAL_SUFFIX = ".journal"
+
+    def __init__(self, cache_file: str, compact_threshold: int = 500, verify_ttl: Optional[float] = None):
         self.cache_file = os.path.expanduser(cache_file)
+        self.journal = Journal(self.cache_file + self.JOURNAL_SUFFIX, "cache journal")
+        self.compact_threshold = compact_threshold
+        self.verifier = FileVerifier(verify_ttl)
         self._downloads: Dict[str, str] = {}
+        self._meta: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.RLock()
         self.load()
 
     def load(self) -> None:
-        """Load cache from file."""
-        if os.path.exists(self.cache_file):
-            try:
-                with open(self.cache_file, "r") as f:
-                    data = json.load(f)
-                    self._downloads = data.get("downloads", {})
-                logger.debug(f"Loaded {len(self._downloads)} cached episodes from {self.cache_file}")
-            except (json.JSONDecodeError, IOError) as e:
-                logger.warning(f"Failed to load cache: {e}")
-                self._downloads = {}
+        """Load cache snapshot from file and replay the journal on top of it."""
+        with self._lock:
+            self.journal.close()
+            self._downloads = {}
+            self._meta = {}
+            if os.path.exists(self.cache_file):
+                try:
+                    with open(self.cache_file, "r") as f:
+                        data = json.load(f)
+                        self._downloads = data.get("downloads", {})
+                        self._meta = data.get("meta", {})
+                except (json.JSONDecodeError, IOError) as e:
+                    logger.warning(f"Failed to load cache: {e}")
+                    self._downloads = {}
+                    self._meta = {}
+
+            torn = self.journal.replay(self._apply)
+            logger.debug(f"Loaded {len(self._downloads)} cached episodes from {self.cache_file} ({self.journal.records} journal records)")
+
+            # A torn tail would corrupt the next append, so fold the journal into a fresh snapshot
+            if torn or self.journal.records >= self.compact_threshold:
+                self.save()
+
+    def _apply(self, record: Dict[str, Any]) -> None:
+        """Apply a single journal record to the in-memory state."""
+        op = record.get("op")
+        key = record.get("id")
+        if op == "set":
+            self._downloads[key] = record["path"]
+            if record.get("size") is not None:
+                self._meta[key] = {"size": record["size"], "sha256": record.get("sha256")}
+            else:
+                self._meta.pop(key, None)
+        elif op == "del":
+            self._downloads.pop(key, None)
+            self._meta.pop(key, None)
+
+    def _append(self, record: Dict[str, Any]) -> None:
+        """Apply a mutation and append it to the journal, compacting when it grows too long."""
+        with self._lock:
+            self._apply(record)
+            self.journal.append([record])
+            if self.journal.records >= self.compact_threshold:
+                self.save()
 
     def save(self) -> None:
-        """Save cache to file."""
-        try:
-            os.makedirs(os.path.dirname(self.cache_file) or ".", exist_ok=True)
-            with open(self.cache_file, "w") as f:
-                json.dump({"downloads": self._downloads}, f, indent=2)
-        except IOError as e:
-            logger.warning(f"Failed to save cache: {e}")
+        """Write a full snapshot atomically and truncate the journal."""
+        with self._lock:
+            self.journal.close()
+            tmp_file = self.cache_file + ".tmp"
+            try:
+                os.makedirs(os.path.dirname(self.cache_file) or ".", exist_ok=True)
+                with open(tmp_file, "w") as f:
+                    json.dump({"downloads": self._downloads, "meta": self._meta}, f, indent=2)
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(tmp_file, self.cache_file)
 
-    DRM_MARKER = "DRM_PROTECTED"
+                # Replaying records already in the snapshot is harmless, so a crash here loses nothing
+                self.journal.truncate()
+            except IOError as e:
+                logger.warning(f"Failed to save cache: {e}")
+
+    def flush(self) -> None:
+        """Push buffered journal records to disk."""
+        with self._lock:
+            self.journal.flush()
 
     def is_downloaded(self, episode_id: int) -> Optional[str]:
         """Check if episode is downloaded and file exists.
@@ -44,34 +175,259 @@ class DownloadCache:
         Also returns DRM_MARKER for DRM-protected episodes.
         """
         key = str(episode_id)
-        if key not in self._downloads:
+        file_path = self._downloads.get(key)
+        if file_path is None:
             return None
 
-        file_path = self._downloads[key]
         if file_path == self.DRM_MARKER:
             return self.DRM_MARKER
 
-        if os.path.exists(file_path) and os.path.getsize(file_path) > 0:
+        size = self.verifier.file_size(file_path)
+        expected = self._meta.get(key, {}).get("size")
+        if size and (expected is None or size == expected):
             return file_path
 
-        # File was deleted, remove from cache
-        logger.debug(f"Cached file no longer exists, removing from cache: {file_path}")
-        self.remove(episode_id)
+        # File was deleted or changed size, remove from cache unless another thread re-marked it meanwhile
+        if size:
+            logger.warning(f"Cached file is {size} bytes instead of {expected}, removing from cache: {file_path}")
+        else:
+            logger.debug(f"Cached file no longer exists, removing from cache: {file_path}")
+        with self._lock:
+            if self._downloads.get(key) == file_path:
+                self._append({"op": "del", "id": key})
         return None
 
-    def mark_drm_protected(self, episode_id: int) -> None:
+    def get_many(self, episode_ids: Iterable[int]) -> Dict[int, str]:
+        """Resolve several episodes at once. Returns {episode_id: file path or DRM_MARKER} for cached ones."""
+        found = {}
+        for episode_id in episode_ids:
+            cached = self.is_downloaded(episode_id)
+            if cached:
+                found[episode_id] = cached
+        return found
+
+    def mark_drm_protected(self, episode_id: int, series: Optional[str] = None) -> None:
         """Mark episode as DRM protected so we skip it on future runs."""
-        self._downloads[str(episode_id)] = self.DRM_MARKER
-        self.save()
+        self._append({"op": "set", "id": str(episode_id), "path": self.DRM_MARKER})
 
-    def mark_downloaded(self, episode_id: int, file_path: str) -> None:
-        """Mark episode as downloaded with its file path."""
-        self._downloads[str(episode_id)] = file_path
-        self.save()
+    def mark_downloaded(self, episode_id: int, file_path: str, series: Optional[str] = None, size: Optional[int] = None, sha256: Optional[str] = None) -> None:
+        """Mark episode as downloaded with its file path and, for verified downloads, its size and hash."""
+        self.verifier.record(file_path)
+        record: Dict[str, Any] = {"op": "set", "id": str(episode_id), "path": file_path}
+        if size is not None:
+            record.update(size=size, sha256=sha256)
+        self._append(record)
 
     def remove(self, episode_id: int) -> None:
         """Remove episode from cache."""
         key = str(episode_id)
-        if key in self._downloads:
-            del self._downloads[key]
-            self.save()
+        with self._lock:
+            if key in self._downloads:
+                self._append({"op": "del", "id": key})
+
+
+class SqliteDownloadCache:
+    """SQLite-backed download cache keyed by episode ID.
+
+    Same interface as DownloadCache. Mutations are grouped into transactions of
+    batch_size statements and committed on flush(), and get_many() resolves a
+    whole season with one indexed query. One connection is shared by all threads
+    and serialised with a lock. A row whose file no longer has the recorded size
+    is dropped like a missing file.
+    """
+
+    DRM_MARKER = DownloadCache.DRM_MARKER
+    QUERY_CHUNK = 500  # Stay well below SQLite's bound-parameter limit
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS downloads (
+            episode_id INTEGER PRIMARY KEY,
+            file_path TEXT,
+            size INTEGER,
+            mtime REAL,
+            drm INTEGER NOT NULL DEFAULT 0,
+            series TEXT,
+            sha256 TEXT,
+            created_at REAL NOT NULL,
+            updated_at REAL NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_downloads_series ON downloads (series);
+    """
+
+    def __init__(self, db_file: str, batch_size: int = 50, legacy_json_file: Optional[str] = None, verify_ttl: Optional[float] = None):
+        self.db_file = os.path.expanduser(db_file)
+        self.batch_size = batch_size
+        self.verifier = FileVerifier(verify_ttl)
+        self._pending = 0
+        self._lock = threading.RLock()
+        os.makedirs(os.path.dirname(self.db_file) or ".", exist_ok=True)
+        self._conn = sqlite3.connect(self.db_file, check_same_thread=False)
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(self.SCHEMA)
+        self._migrate()
+        if legacy_json_file:
+            self._import_json(os.path.expanduser(legacy_json_file))
+        count = self._conn.execute("SELECT COUNT(*) FROM downloads").fetchone()[0]
+        logger.debug(f"Loaded {count} cached episodes from {self.db_file}")
+
+    def _migrate(self) -> None:
+        """Add columns introduced after a database was created."""
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(downloads)")}
+        if "sha256" not in columns:
+            with self._conn:
+                self._conn.execute("ALTER TABLE downloads ADD COLUMN sha256 TEXT")
+
+    def _import_json(self, json_file: str) -> None:
+        """Seed an empty database from an existing JSON cache."""
+        if self._conn.execute("SELECT 1 FROM downloads LIMIT 1").fetchone():
+            return
+        if not os.path.exists(json_file) and not os.path.exists(json_file + DownloadCache.JOURNAL_SUFFIX):
+            return
+
+        legacy = DownloadCache(json_file)
+        now = time.time()
+        rows = [
+            (
+                int(key),
+                None if path == self.DRM_MARKER else path,
+                legacy._meta.get(key, {}).get("size"),
+                legacy._meta.get(key, {}).get("sha256"),
+                int(path == self.DRM_MARKER),
+                now,
+                now,
+            )
+            for key, path in legacy._downloads.items()
+            if key.isdigit()
+        ]
+        with self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO downloads (episode_id, file_path, size, sha256, drm, created_at, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?)", rows
+            )
+        logger.info(f"Imported {len(rows)} cached episodes from {json_file}")
+
+    def _write(self, sql: str, params: tuple) -> None:
+        """Execute a mutation inside the open transaction, committing every batch_size statements."""
+        with self._lock:
+            try:
+                self._conn.execute(sql, params)
+                self._pending += 1
+                if self._pending >= self.batch_size:
+                    self.flush()
+            except sqlite3.Error as e:
+                logger.warning(f"Failed to update cache: {e}")
+
+    def _upsert(
+        self, episode_id: int, file_path: Optional[str], drm: bool, series: Optional[str], size: Optional[int] = None, sha256: Optional[str] = None
+    ) -> None:
+        mtime = None
+        if file_path:
+            try:
+                stat = os.stat(file_path)
+                size, mtime = size if size is not None else stat.st_size, stat.st_mtime
+            except OSError:
+                pass
+
+        now = time.time()
+        self._write(
+            """
+            INSERT INTO downloads (episode_id, file_path, size, mtime, drm, series, sha256, created_at, updated_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT (episode_id) DO UPDATE SET
+                file_path = excluded.file_path, size = excluded.size, mtime = excluded.mtime, drm = excluded.drm,
+                series = COALESCE(excluded.series, downloads.series), sha256 = excluded.sha256, updated_at = excluded.updated_at
+            """,
+            (episode_id, file_path, size, mtime, int(drm), series, sha256, now, now),
+        )
+
+    def _resolve(self, episode_id: int, file_path: Optional[str], drm: int, expected: Optional[int]) -> Optional[str]:
+        """Turn a stored row into an is_downloaded() answer, dropping rows whose file is gone or changed size."""
+        if drm:
+            return self.DRM_MARKER
+
+        size = self.verifier.file_size(file_path) if file_path else None
+        if size and (expected is None or size == expected):
+            return file_path
+
+        if size:
+            logger.warning(f"Cached file is {size} bytes instead of {expected}, removing from cache: {file_path}")
+        else:
+            logger.debug(f"Cached file no longer exists, removing from cache: {file_path}")
+        self.remove(episode_id)
+        return None
+
+    def load(self) -> None:
+        """Rows are read on demand, nothing to load."""
+
+    def save(self) -> None:
+        """Commit pending mutations."""
+        self.flush()
+
+    def flush(self) -> None:
+        """Commit the open transaction."""
+        with self._lock:
+            try:
+                self._conn.commit()
+                self._pending = 0
+            except sqlite3.Error as e:
+                logger.warning(f"Failed to save cache: {e}")
+
+    def is_downloaded(self, episode_id: int) -> Optional[str]:
+        """Check if episode is downloaded and file exists.
+
+        Returns the file path if cached and file exists, None otherwise.
+        Also returns DRM_MARKER for DRM-protected episodes.
+        """
+        with self._lock:
+            row = self._conn.execute("SELECT file_path, drm, size FROM downloads WHERE episode_id = ?", (episode_id,)).fetchone()
+        if not row:
+            return None
+        return self._resolve(episode_id, *row)
+
+    def get_many(self, episode_ids: Iterable[int]) -> Dict[int, str]:
+        """Resolve several episodes at once. Returns {episode_id: file path or DRM_MARKER} for cached ones."""
+        ids = list(episode_ids)
+        rows = []
+        with self._lock:
+            for i in range(0, len(ids), self.QUERY_CHUNK):
+                chunk = ids[i : i + self.QUERY_CHUNK]
+                placeholders = ",".join("?" * len(chunk))
+                rows.extend(
+                    self._conn.execute(f"SELECT episode_id, file_path, drm, size FROM downloads WHERE episode_id IN ({placeholders})", chunk).fetchall()
+                )
+
+        found = {}
+        for episode_id, file_path, drm, size in rows:
+            resolved = self._resolve(episode_id, file_path, drm, size)
+            if resolved:
+                found[episode_id] = resolved
+        return found
+
+    def mark_drm_protected(self, episode_id: int, series: Optional[str] = None) -> None:
+        """Mark episode as DRM protected so we skip it on future runs."""
+        self._upsert(episode_id, None, True, series)
+
+    def mark_downloaded(self, episode_id: int, file_path: str, series: Optional[str] = None, size: Optional[int] = None, sha256: Optional[str] = None) -> None:
+        """Mark episode as downloaded with its file path and, for verified downloads, its size and hash."""
+        self.verifier.record(file_path)
+        self._upsert(episode_id, file_path, False, series, size, sha256)
+
+    def remove(self, episode_id: int) -> None:
+        """Remove episode from cache."""
+        self._write("DELETE FROM downloads WHERE episode_id = ?", (episode_id,))
+
+
+def create_cache(
+    cache_file: str, backend: str = "json", compact_threshold: int = 500, batch_size: int = 50, verify_ttl: Optional[float] = None
+) -> Union[DownloadCache, SqliteDownloadCache]:
+    """Create the configured cache backend.
+
+    The SQLite database lives next to cache_file with a .sqlite3 extension and is
+    seeded from the JSON cache the first time it is opened. verify_ttl enables
+    folder-scan verification (see FileVerifier).
+    """
+    if backend == "sqlite":
+        db_file = os.path.splitext(os.path.expanduser(cache_file))[0] + ".sqlite3"
+        return SqliteDownloadCache(db_file, batch_size, legacy_json_file=cache_file, verify_ttl=verify_ttl)
+    if backend != "json":
+        logger.warning(f"Unknown cache backend '{backend}', using json")
+    return DownloadCache(cache_file, compact_threshold, verify_ttl)
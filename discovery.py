@@ -5,7 +5,7 @@ from typing import Dict, List, Set
 from loguru import logger
 
 from settings import settings, update_config, CONFIG_PATH
-from err_api import discover_missing_urls, extract_show_slug
+from err_api import build_season_url, discover_missing_urls, extract_show_slug, extract_video_id
 
 
 def add_urls_to_config(missing_by_show: Dict[str, Set[str]]) -> int:
@@ -28,6 +28,32 @@ def add_urls_to_config(missing_by_show: Dict[str, Set[str]]) -> int:
     return added
 
 
+def find_new_season_urls(season_ids_by_show: Dict[str, Set[int]], tv_show_urls: List[str]) -> Dict[str, Set[str]]:
+    """Turn season IDs seen while downloading into season URLs missing from the config."""
+    existing_ids = {extract_video_id(url) for url in tv_show_urls}
+    missing_by_show: Dict[str, Set[str]] = {}
+
+    for slug, season_ids in season_ids_by_show.items():
+        missing = {build_season_url(season_id, slug) for season_id in season_ids if season_id not in existing_ids}
+        if missing:
+            missing_by_show[slug] = missing
+            logger.success(f"Leitud {len(missing)} uut URL-i: {slug.replace('-', ' ')}")
+            for url in sorted(missing):
+                logger.success(f"  {url}")
+
+    return missing_by_show
+
+
+def add_discovered_urls(season_ids_by_show: Dict[str, Set[int]]) -> int:
+    """Add season URLs found during a download run to the config."""
+    missing = find_new_season_urls(season_ids_by_show, settings.tv_shows)
+    if not missing:
+        logger.success(f"Kõik URL-id on juba {CONFIG_PATH}-is!")
+        return 0
+
+    return add_urls_to_config(missing)
+
+
 def run_discovery(tv_show_urls: List[str], add_to_config: bool) -> int:
     """Run URL discovery mode."""
     logger.info("Otsin uusi hooaegade URL-e...")
@@ -0,0 +1,152 @@
+"""Persistent priority queue of episodes waiting to be downloaded."""
+
+import heapq
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from loguru import logger
+
+from journal import Journal
+from state_store import load_state, save_state
+
+# Priority tiers, lowest first
+NEW = 0  # Appeared since the last run, or a single video
+BACKFILL = 1  # Older episodes still missing from the library
+DRM_RECHECK = 2  # DRM-protected episodes due for a look whether the DRM is gone
+
+
+class DownloadQueue:
+    """Episodes waiting for download, served new episodes first and newest first within a tier.
+
+    ERR content IDs grow over time, so a higher ID stands in for a later air date.
+    Every entry stays in the state file until it is finished, so episodes that were
+    queued or in flight when a run was interrupted are picked up by the next run.
+    Like the download cache, pushes and finished episodes are appended to a journal
+    and folded into the snapshot every compact_threshold records, or as soon as
+    the queue runs empty.
+    """
+
+    JOURNAL_SUFFIX = ".journal"
+
+    def __init__(self, state_file: str, compact_threshold: int = 500):
+        self.state_file = os.path.expanduser(state_file)
+        self.journal = Journal(self.state_file + self.JOURNAL_SUFFIX, "download queue journal")
+        self.compact_threshold = compact_threshold
+        self._items: Dict[str, Dict] = {}
+        self._heap: List[Tuple[int, int, int]] = []
+        self._taken: Set[int] = set()
+        self._fillers = 0
+        self._lock = threading.Lock()
+        self._changed = threading.Condition(self._lock)
+        self.load()
+
+    def load(self) -> None:
+        """Load unfinished entries from file and replay the journal on top of them."""
+        self._items = load_state(self.state_file, "queue", "download queue")
+
+        # A torn tail would corrupt the next append, so fold the journal into a fresh snapshot
+        if self.journal.replay(self._apply) or self.journal.records >= self.compact_threshold:
+            self.save()
+
+        self._heap = [(item["tier"], -int(key), int(key)) for key, item in self._items.items()]
+        heapq.heapify(self._heap)
+        if self._items:
+            logger.info(f"Resuming {len(self._items)} queued downloads from the previous run")
+
+    def _apply(self, record: Dict[str, Any]) -> None:
+        """Apply a single journal record to the entries."""
+        if record.get("op") == "set":
+            self._items[record["id"]] = record["item"]
+        elif record.get("op") == "del":
+            self._items.pop(record.get("id"), None)
+
+    def _append(self, records: List[Dict[str, Any]]) -> None:
+        """Journal applied mutations, compacting when the journal grows too long or the queue is empty."""
+        if not records:
+            return
+        self.journal.append(records)
+        if self.journal.records >= self.compact_threshold or not self._items:
+            self.save()
+
+    def save(self) -> None:
+        """Atomically write unfinished entries to file and truncate the journal."""
+        self.journal.close()
+        if not save_state(self.state_file, "queue", self._items, "download queue"):
+            return
+        try:
+            self.journal.truncate()
+        except IOError as e:
+            logger.warning(f"Failed to truncate download queue journal: {e}")
+
+    @contextmanager
+    def filling(self) -> Iterator[None]:
+        """While the block runs, pop waits for more pushes instead of reporting an empty queue."""
+        with self._lock:
+            self._fillers += 1
+        try:
+            yield
+        finally:
+            with self._changed:
+                self._fillers -= 1
+                self._changed.notify_all()
+
+    def is_filling(self) -> bool:
+        """Check if episodes may still be pushed by a running filling block."""
+        with self._lock:
+            return self._fillers > 0
+
+    def push_many(self, entries: Iterable[Tuple[int, str, Optional[str], int, Optional[Dict]]]) -> None:
+        """Queue (episode_id, content_type, series_name, tier, metadata) entries.
+
+        A re-queued episode keeps its best tier and takes the newest metadata.
+        """
+        with self._changed:
+            records = []
+            for episode_id, content_type, series_name, tier, metadata in entries:
+                key = str(episode_id)
+                item = self._items.get(key)
+                if item is not None and item["tier"] <= tier:
+                    if metadata:
+                        item["metadata"] = metadata
+                        records.append({"op": "set", "id": key, "item": item})
+                    continue
+                self._items[key] = {"content_type": content_type, "series_name": series_name, "tier": tier, "queued_at": time.time()}
+                if metadata:
+                    self._items[key]["metadata"] = metadata
+                heapq.heappush(self._heap, (tier, -episode_id, episode_id))
+                records.append({"op": "set", "id": key, "item": self._items[key]})
+            self._append(records)
+            self._changed.notify_all()
+
+    def pop(self) -> Optional[Tuple[int, Dict]]:
+        """Take the most urgent episode that no worker has taken yet. Returns (episode_id, entry) or None.
+
+        While the queue is filling, an empty queue blocks until something is pushed or filling ends.
+        """
+        with self._changed:
+            while True:
+                while self._heap:
+                    tier, _, episode_id = heapq.heappop(self._heap)
+                    item = self._items.get(str(episode_id))
+                    # Skip heap entries superseded by a better tier or already handed out
+                    if item is None or item["tier"] != tier or episode_id in self._taken:
+                        continue
+                    self._taken.add(episode_id)
+                    return episode_id, dict(item)
+                if not self._fillers:
+                    return None
+                self._changed.wait()
+
+    def done(self, episode_id: int) -> None:
+        """Remove a handled episode, whether it was downloaded, skipped or failed."""
+        with self._lock:
+            self._taken.discard(episode_id)
+            if self._items.pop(str(episode_id), None) is not None:
+                self._append([{"op": "del", "id": str(episode_id)}])
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._items) - len(self._taken)
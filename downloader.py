@@ -1,65 +1,102 @@
 """Download module for ERR video downloading."""
 
+import queue
+import threading
 from concurrent.futures import ThreadPoolExecutor, as_completed
-from typing import Dict, List, Optional, Union, Tuple
+from typing import Dict, List, Optional, Set, Union, Tuple
 
 from loguru import logger
 
 from settings import settings
-from err_api import extract_video_id, extract_show_slug, get_all_episodes_from_series, run_download
-from cache import DownloadCache
+from err_api import download_mp4, extract_video_id, extract_show_slug, get_all_episodes_from_series, log_connection_reuse, negative_cache, prepare_download
+from cache import create_cache
+from disk_io import log_run_io, run_io_stats
+from discovery import add_discovered_urls
+from download_queue import BACKFILL, DRM_RECHECK, NEW, DownloadQueue
+from drm_recheck import DrmRecheckSchedule
+from negative_cache import REASON_LABELS
+from series_state import SeriesStateStore
+from run_metrics import episode_scope, run_metrics
 
-cache = DownloadCache(settings.cache_file)
+cache = create_cache(settings.cache_file, settings.cache.backend, settings.cache.compact_threshold, settings.cache.batch_size, settings.cache.get_verify_ttl())
 
-DownloadResult = Union[Tuple[str, str], str, bool]
+series_state = (
+    SeriesStateStore(settings.get_state_file("series_state.json"), settings.cache.series_full_check_hours * 3600) if settings.cache.series_state else None
+)
+
+drm_schedule = (
+    DrmRecheckSchedule(settings.get_state_file("drm_recheck.json"), settings.cache.drm_recheck_days * 86400, settings.cache.drm_recheck_max_days * 86400)
+    if settings.cache.drm_recheck_days > 0
+    else None
+)
+
+download_queue = DownloadQueue(settings.get_state_file("download_queue.json"), settings.cache.compact_threshold)
+
+DownloadResult = Union[Tuple[str, str], Tuple[str, str, int, Optional[str]], str, bool]
+
+stats_lock = threading.Lock()
 
 
 def update_stats(stats: Dict, result: DownloadResult, video_info: str = "") -> None:
     """Update statistics based on download result."""
-    stats["total_processed"] += 1
-
     status = result[0] if isinstance(result, tuple) else result
 
-    if status == settings.constants.drm_protected:
-        stats["drm_protected"] += 1
-        if video_info:
-            stats["drm_protected_list"].append(video_info)
-    elif status == settings.constants.download_skipped:
-        stats["skipped"] += 1
-    elif status == settings.constants.cache_skipped:
-        stats["skipped"] += 1
-    elif status == "success":
-        stats["successful"] += 1
-        if video_info:
-            stats["successful_list"].append(video_info)
-    else:
+    with stats_lock:
+        stats["total_processed"] += 1
+
+        if status == settings.constants.drm_protected:
+            stats["drm_protected"] += 1
+            if video_info:
+                stats["drm_protected_list"].append(video_info)
+        elif status == settings.constants.download_skipped:
+            stats["skipped"] += 1
+        elif status == settings.constants.cache_skipped:
+            stats["skipped"] += 1
+        elif status == settings.constants.negative_cached:
+            stats["negative_cached"] += 1
+        elif status == "success":
+            stats["successful"] += 1
+            if video_info:
+                stats["successful_list"].append(video_info)
+        else:
+            stats["failed"] += 1
+            if video_info:
+                stats["failed_list"].append(video_info)
+
+
+def record_url_failure(stats: Dict, message: str) -> None:
+    """Count a URL-level failure that never reached a download."""
+    with stats_lock:
         stats["failed"] += 1
-        if video_info:
-            stats["failed_list"].append(video_info)
+        stats["failed_list"].append(message)
 
 
-def handle_download_result(result: DownloadResult, video_id: int, video_info: str, stats: Dict) -> None:
+def handle_download_result(result: DownloadResult, video_id: int, video_info: str, stats: Dict, series_name: Optional[str] = None) -> None:
     """Process download result: update stats and cache successful downloads."""
     update_stats(stats, result, video_info)
 
     status = result[0] if isinstance(result, tuple) else result
 
-    if isinstance(result, tuple) and len(result) == 2:
-        _, file_path = result
+    if isinstance(result, tuple) and len(result) >= 2:
+        file_path = result[1]
+        size, digest = result[2:4] if len(result) == 4 else (None, None)
         if status in ("success", settings.constants.download_skipped):
-            cache.mark_downloaded(video_id, file_path)
+            cache.mark_downloaded(video_id, file_path, series_name, size, digest)
     elif status == settings.constants.drm_protected:
-        cache.mark_drm_protected(video_id)
+        cache.mark_drm_protected(video_id, series_name)
     elif not result:
         logger.error(f"Failed to download: {video_info}")
 
 
-def filter_cached_episodes(episode_ids: List[int], series_name: Optional[str], stats: Dict) -> List[int]:
-    """Filter out cached and DRM-protected episodes and update stats for skipped ones."""
+def filter_cached_episodes(episode_ids: List[int], content_type: str, series_name: Optional[str], stats: Dict) -> List[int]:
+    """Filter out cached, DRM-protected and remembered missing episodes and update stats for skipped ones."""
     episodes_to_download = []
+    drm_ids = []
+    cached_episodes = cache.get_many(episode_ids)
     for ep_id in episode_ids:
-        cached = cache.is_downloaded(ep_id)
+        cached = cached_episodes.get(ep_id)
         if cached == cache.DRM_MARKER:
+            drm_ids.append(ep_id)
             logger.info(f"[{series_name}] DRM cached, skipping: Episode ID {ep_id}")
             video_info = f"{series_name} - Episode ID {ep_id}" if series_name else f"Episode ID {ep_id}"
             update_stats(stats, settings.constants.drm_protected, video_info)
@@ -67,76 +104,226 @@ def filter_cached_episodes(episode_ids: List[int], series_name: Optional[str], s
             logger.info(f"[{series_name}] Cached, skipping: Episode ID {ep_id}")
             video_info = f"{series_name} - Episode ID {ep_id}" if series_name else f"Episode ID {ep_id}"
             update_stats(stats, settings.constants.cache_skipped, video_info)
+        elif reason := negative_cache.get(ep_id):
+            logger.info(f"[{series_name}] Meeles kui puuduv ({REASON_LABELS[reason]}), skipping: Episode ID {ep_id}")
+            video_info = f"{series_name} - Episode ID {ep_id}" if series_name else f"Episode ID {ep_id}"
+            update_stats(stats, settings.constants.negative_cached, video_info)
         else:
             episodes_to_download.append(ep_id)
+
+    # DRM markers from before re-checks existed get their schedule here
+    if drm_schedule is not None and drm_ids:
+        drm_schedule.track_many((ep_id, content_type, series_name) for ep_id in drm_ids)
     return episodes_to_download
 
 
-def download_episodes_threaded(episode_ids: List[int], content_type: str, series_name: Optional[str], stats: Dict) -> None:
-    """Download episodes using ThreadPoolExecutor."""
-    episodes_to_download = filter_cached_episodes(episode_ids, series_name, stats)
+def select_pending_episodes(series_id: int, series_name: Optional[str], episode_ids: List[int], stats: Dict) -> List[int]:
+    """Drop episodes of a series that are unchanged since the last run and count them as skipped."""
+    if series_state is None:
+        return episode_ids
 
-    if not episodes_to_download:
-        logger.info(f"[{series_name}] All {len(episode_ids)} episodes already cached")
-        return
+    pending_ids = series_state.pending(series_id, episode_ids)
+    unchanged = len(episode_ids) - len(pending_ids)
+    if not pending_ids:
+        logger.info(f"[{series_name}] Sari pole eelmisest käivitusest muutunud, kõik {len(episode_ids)} osa vahele jäetud")
+    elif unchanged:
+        logger.info(f"[{series_name}] {unchanged} osa pole eelmisest käivitusest muutunud, kontrollin {len(pending_ids)} osa")
+    if unchanged:
+        with stats_lock:
+            stats["total_processed"] += unchanged
+            stats["skipped"] += unchanged
+    return pending_ids
 
-    logger.info(
-        f"[{series_name}] Starting download of {len(episodes_to_download)} episodes with {settings.threading.get_max_workers()} workers ({len(episode_ids) - len(episodes_to_download)} cached)"
-    )
-    with ThreadPoolExecutor(max_workers=settings.threading.get_max_workers()) as executor:
-        futures = {executor.submit(run_download, ep_id, content_type, series_name): ep_id for ep_id in episodes_to_download}
-        for future in as_completed(futures):
-            ep_id = futures[future]
-            result = future.result()
-            video_info = f"{series_name} - Episode ID {ep_id}" if series_name else f"Episode ID {ep_id}"
-            handle_download_result(result, ep_id, video_info, stats)
 
+def get_known_seasons(series_id: int) -> Optional[Dict[int, List[int]]]:
+    """Return the season episode lists recorded for a series, to be filled in by the series lookup (None when series state is off)."""
+    if series_state is None:
+        return None
+    return series_state.known_seasons(series_id)
 
-def download_episodes_sequential(episode_ids: List[int], content_type: str, series_name: Optional[str], stats: Dict) -> None:
-    """Download episodes sequentially."""
-    logger.info(f"[{series_name}] Starting download of {len(episode_ids)} episodes")
-    cached_count = 0
 
-    for i, ep_id in enumerate(episode_ids, 1):
-        video_info = f"{series_name} - Episode ID {ep_id}" if series_name else f"Episode ID {ep_id}"
+def record_series_state(series_id: int, episode_ids: List[int], checked_ids: List[int], seasons: Optional[Dict[int, List[int]]] = None) -> None:
+    """Remember the series fingerprint, its seasons and which checked episodes are still not in the cache."""
+    if series_state is None:
+        return
+
+    resolved = cache.get_many(checked_ids)
+    series_state.record(series_id, episode_ids, checked_ids, [ep_id for ep_id in checked_ids if ep_id not in resolved], seasons)
 
-        cached = cache.is_downloaded(ep_id)
-        if cached == cache.DRM_MARKER:
-            logger.info(f"[{series_name}] DRM cached, skipping: Episode ID {ep_id}")
-            update_stats(stats, settings.constants.drm_protected, video_info)
-            cached_count += 1
-            continue
-        elif cached:
-            logger.info(f"[{series_name}] Cached, skipping: Episode ID {ep_id}")
-            update_stats(stats, settings.constants.cache_skipped, video_info)
-            cached_count += 1
-            continue
 
-        logger.info(f"[{series_name}] Processing episode {i}/{len(episode_ids)}")
-        result = run_download(ep_id, content_type, series_name)
-        handle_download_result(result, ep_id, video_info, stats)
+def queue_episodes(
+    series_id: int, episode_ids: List[int], content_type: str, series_name: Optional[str], stats: Dict, episode_metadata: Optional[Dict[int, dict]] = None
+) -> None:
+    """Queue the uncached episodes of a series, episodes that appeared since the last run first.
 
-    if cached_count > 0:
-        logger.info(f"[{series_name}] Skipped {cached_count} cached episodes")
+    Metadata found in the series response travels with each queued episode.
+    """
+    episodes_to_download = filter_cached_episodes(episode_ids, content_type, series_name, stats)
 
+    if not episodes_to_download:
+        logger.info(f"[{series_name}] All {len(episode_ids)} episodes already cached")
+        return
+
+    new_ids = series_state.new_ids(series_id, episode_ids) if series_state is not None else set()
+    episode_metadata = episode_metadata or {}
+    download_queue.push_many(
+        (ep_id, content_type, series_name, NEW if ep_id in new_ids else BACKFILL, episode_metadata.get(ep_id)) for ep_id in episodes_to_download
+    )
+    new_count = sum(1 for ep_id in episodes_to_download if ep_id in new_ids)
+    logger.info(f"[{series_name}] Queued {len(episodes_to_download)} episodes ({new_count} new, {len(episode_ids) - len(episodes_to_download)} cached)")
 
-def download_single_video(video_id: int, content_type: str, video_info: str, stats: Dict) -> None:
-    """Download a single video with cache check."""
+
+def queue_single_video(video_id: int, content_type: str, video_info: str, stats: Dict) -> None:
+    """Queue a single video with cache check."""
     cached = cache.is_downloaded(video_id)
     if cached == cache.DRM_MARKER:
         logger.info(f"DRM cached, skipping: {video_info}")
         update_stats(stats, settings.constants.drm_protected, video_info)
+        if drm_schedule is not None:
+            drm_schedule.track_many([(video_id, content_type, None)])
         return
     elif cached:
         logger.info(f"Cached, skipping: {video_info}")
         update_stats(stats, settings.constants.cache_skipped, video_info)
         return
+    elif reason := negative_cache.get(video_id):
+        logger.info(f"Meeles kui puuduv ({REASON_LABELS[reason]}), skipping: {video_info}")
+        update_stats(stats, settings.constants.negative_cached, video_info)
+        return
+
+    download_queue.push_many([(video_id, content_type, None, NEW, None)])
+
+
+def take_queued_episode(stats: Dict) -> Optional[Tuple[int, Dict]]:
+    """Pop the next queued episode that still needs downloading; ones cached since they were queued are finished here."""
+    while (queued := download_queue.pop()) is not None:
+        ep_id, item = queued
+        cached = cache.is_downloaded(ep_id)
+        if not cached or (cached == cache.DRM_MARKER and item["tier"] == DRM_RECHECK):
+            return queued
+
+        video_info = queued_video_info(ep_id, item)
+        status = settings.constants.drm_protected if cached == cache.DRM_MARKER else settings.constants.cache_skipped
+        update_stats(stats, status, video_info)
+        download_queue.done(ep_id)
+    return None
+
 
-    result = run_download(video_id, content_type=content_type)
-    handle_download_result(result, video_id, video_info, stats)
+def queued_video_info(ep_id: int, item: Dict) -> str:
+    """Describe a queued episode for logs and the summary."""
+    return f"{item['series_name']} - Episode ID {ep_id}" if item.get("series_name") else f"Video ID {ep_id}"
 
 
-def process_url(url: str, content_type: str, stats: Dict, processed_slugs: set) -> None:
+def finish_queued_episode(ep_id: int, item: Dict, result: DownloadResult, stats: Dict) -> None:
+    """Record the outcome of a queued episode and take it off the queue."""
+    try:
+        video_info = queued_video_info(ep_id, item)
+        rechecked = item["tier"] == DRM_RECHECK
+        if rechecked and result == settings.constants.drm_protected:
+            # Already counted as DRM-protected when its series was processed
+            logger.info(f"Still DRM-protected, checking again later: {video_info}")
+        else:
+            handle_download_result(result, ep_id, video_info, stats, item["series_name"])
+        update_drm_schedule(ep_id, item, result)
+    finally:
+        download_queue.done(ep_id)
+
+
+def update_drm_schedule(ep_id: int, item: Dict, result: DownloadResult) -> None:
+    """Schedule the next DRM re-check of an episode, or drop it from the schedule once it downloaded."""
+    if drm_schedule is None:
+        return
+
+    status = result[0] if isinstance(result, tuple) else result
+    if status in ("success", settings.constants.download_skipped):
+        if item["tier"] == DRM_RECHECK:
+            logger.success(f"DRM removed, downloaded: {queued_video_info(ep_id, item)}")
+        drm_schedule.remove(ep_id)
+    elif status == settings.constants.drm_protected or item["tier"] == DRM_RECHECK:
+        # A failed re-check backs off too, so one broken episode cannot use up every run's batch
+        drm_schedule.still_protected(ep_id, item["content_type"], item["series_name"])
+
+
+def queue_drm_rechecks() -> None:
+    """Queue the DRM-protected episodes whose re-check is due, a small batch behind all other downloads."""
+    if drm_schedule is None or settings.cache.drm_recheck_batch <= 0:
+        return
+
+    due = drm_schedule.due(settings.cache.drm_recheck_batch)
+    if due:
+        logger.info(f"Re-checking {len(due)} DRM-protected episodes")
+        download_queue.push_many((ep_id, entry["content_type"], entry["series_name"], DRM_RECHECK, None) for ep_id, entry in due)
+
+
+def drain_queue(stats: Dict) -> None:
+    """Download queued episodes in priority order until the queue is empty.
+
+    Two stages run side by side: metadata workers look episodes up ahead of time
+    into a bounded prefetch queue, and transfer workers only stream files, so a
+    transfer slot never sits idle waiting for the API. While the queue is still
+    filling, the workers keep waiting for new episodes instead of stopping.
+    """
+    filling = download_queue.is_filling()
+    if not len(download_queue) and not filling:
+        return
+
+    threaded = settings.threading.use_threading
+    transfer_workers = settings.threading.get_max_workers() if threaded else 1
+    metadata_workers = max(settings.threading.metadata_workers, 1) if threaded else 1
+    prepared: queue.Queue = queue.Queue(maxsize=max(settings.threading.prefetch, 1))
+
+    logger.info("=" * 80)
+    queued = f"queued episodes ({len(download_queue)} so far)" if filling else f"{len(download_queue)} queued episodes"
+    logger.info(f"Downloading {queued} with {transfer_workers} transfer and {metadata_workers} metadata workers")
+
+    def metadata_worker() -> None:
+        while (queued := take_queued_episode(stats)) is not None:
+            ep_id, item = queued
+            try:
+                with episode_scope(ep_id):
+                    details = prepare_download(ep_id, item["content_type"], item["series_name"], item.get("metadata"))
+            except Exception as e:
+                logger.error(f"Failed to look up {queued_video_info(ep_id, item)}: {str(e)}")
+                details = False
+
+            if isinstance(details, tuple):
+                prepared.put((ep_id, item, details))
+            else:
+                finish_queued_episode(ep_id, item, details, stats)
+
+    def transfer_worker() -> None:
+        while (entry := prepared.get()) is not None:
+            ep_id, item, details = entry
+            result: DownloadResult = False
+            try:
+                with episode_scope(ep_id):
+                    result = download_mp4(*details, item["content_type"], settings.download.skip_existing, ep_id)
+            except Exception as e:
+                logger.error(f"Download failed: {queued_video_info(ep_id, item)}: {str(e)}")
+            finish_queued_episode(ep_id, item, result, stats)
+
+    with ThreadPoolExecutor(max_workers=transfer_workers + metadata_workers) as executor:
+        transfers = [executor.submit(transfer_worker) for _ in range(transfer_workers)]
+        lookups = [executor.submit(metadata_worker) for _ in range(metadata_workers)]
+        try:
+            for future in as_completed(lookups):
+                future.result()
+        finally:
+            # One stop marker per transfer worker, queued behind the remaining work
+            for _ in transfers:
+                prepared.put(None)
+        for future in as_completed(transfers):
+            future.result()
+
+
+def get_season_id_collector(discovered: Optional[Dict[str, Set[int]]], slug: str, content_type: str) -> Optional[Set[int]]:
+    """Get the set that collects a show's season IDs when the run also discovers URLs."""
+    if discovered is None or not slug or content_type != settings.constants.content_type_tv_shows:
+        return None
+    return discovered.setdefault(slug, set())
+
+
+def process_url(url: str, content_type: str, stats: Dict, processed_slugs: set, discovered: Optional[Dict[str, Set[int]]] = None) -> None:
     """Process a single URL for download."""
     logger.info("=" * 80)
     logger.success(f"Processing URL: {url}")
@@ -144,8 +331,7 @@ def process_url(url: str, content_type: str, stats: Dict, processed_slugs: set)
     video_id = extract_video_id(url)
     if not video_id:
         logger.error("Failed to extract video ID")
-        stats["failed"] += 1
-        stats["failed_list"].append(f"URL: {url} (failed to extract video ID)")
+        record_url_failure(stats, f"URL: {url} (failed to extract video ID)")
         return
 
     if settings.download.download_all_episodes:
@@ -154,28 +340,52 @@ def process_url(url: str, content_type: str, stats: Dict, processed_slugs: set)
             logger.info(f"[{slug}] Sari juba töödeldud, vahele jäetud (duplikaat-URL)")
             return
 
-        logger.info("Fetching all episodes from series...")
-        series_name, episode_ids = get_all_episodes_from_series(video_id)
-
-        if episode_ids:
-            if slug:
-                processed_slugs.add(slug)
-
-            if settings.threading.use_threading:
-                download_episodes_threaded(episode_ids, content_type, series_name, stats)
-            else:
-                download_episodes_sequential(episode_ids, content_type, series_name, stats)
-        elif series_name == settings.constants.content_not_found_404:
-            logger.warning(f"Sisu on ERRist eemaldatud ({settings.constants.content_not_found_404}), vahele jäetud: {url}")
-            stats["failed"] += 1
-            stats["failed_list"].append(f"URL: {url} (sisu eemaldatud ERRist)")
-        else:
-            title_info = f" '{series_name}'" if series_name else ""
-            logger.warning(f"No episodes found for{title_info} {url} (ID: {video_id}), trying single video...")
-            download_single_video(video_id, content_type, f"Video ID {video_id} from {url}", stats)
+        process_series(url, video_id, slug, content_type, stats, processed_slugs, discovered)
     else:
         logger.info("Downloading single video")
-        download_single_video(video_id, content_type, f"Video ID {video_id} from {url}", stats)
+        queue_single_video(video_id, content_type, f"Video ID {video_id} from {url}", stats)
+
+
+def process_series(
+    url: str, video_id: int, slug: str, content_type: str, stats: Dict, processed_slugs: set, discovered: Optional[Dict[str, Set[int]]] = None
+) -> None:
+    """Fetch every episode of the series behind url and queue the missing ones."""
+    logger.info("Fetching all episodes from series...")
+    episode_metadata: Dict[int, dict] = {}
+    seasons = get_known_seasons(video_id)
+    series_name, episode_ids = get_all_episodes_from_series(video_id, get_season_id_collector(discovered, slug, content_type), episode_metadata, seasons)
+    queue_series(url, video_id, slug, content_type, stats, processed_slugs, series_name, episode_ids, episode_metadata, seasons)
+
+
+def queue_series(
+    url: str,
+    video_id: int,
+    slug: str,
+    content_type: str,
+    stats: Dict,
+    processed_slugs: set,
+    series_name: Optional[str],
+    episode_ids: List[int],
+    episode_metadata: Dict[int, dict],
+    seasons: Optional[Dict[int, List[int]]] = None,
+) -> None:
+    """Queue the missing episodes of an enumerated series, or fall back to the single video when there are none."""
+    if episode_ids:
+        if slug:
+            processed_slugs.add(slug)
+
+        pending_ids = select_pending_episodes(video_id, series_name, episode_ids, stats)
+        if pending_ids:
+            queue_episodes(video_id, pending_ids, content_type, series_name, stats, episode_metadata)
+        # Queued episodes count as unresolved, so the next run checks them again
+        record_series_state(video_id, episode_ids, pending_ids, seasons)
+    elif series_name == settings.constants.content_not_found_404:
+        logger.warning(f"Sisu on ERRist eemaldatud ({settings.constants.content_not_found_404}), vahele jäetud: {url}")
+        record_url_failure(stats, f"URL: {url} (sisu eemaldatud ERRist)")
+    else:
+        title_info = f" '{series_name}'" if series_name else ""
+        logger.warning(f"No episodes found for{title_info} {url} (ID: {video_id}), trying single video...")
+        queue_single_video(video_id, content_type, f"Video ID {video_id} from {url}", stats)
 
 
 def print_summary(stats: Dict) -> None:
@@ -195,6 +405,8 @@ def print_summary(stats: Dict) -> None:
 
     logger.info("")
     logger.info(f"Juba olemas (vahele jäetud): {stats['skipped']}")
+    if stats["negative_cached"]:
+        logger.info(f"Meeles kui puuduv ERRis (vahele jäetud): {stats['negative_cached']}")
 
     if stats["drm_protected_list"]:
         logger.info("")
@@ -211,15 +423,26 @@ def print_summary(stats: Dict) -> None:
     logger.info("=" * 80)
 
 
-def run_download_mode() -> int:
-    """Run download mode."""
-    all_urls = settings.tv_shows + settings.movies
-    logger.info(f"Total URLs to process: {len(all_urls)} (TV Shows: {len(settings.tv_shows)}, Movies: {len(settings.movies)})")
+def finish_run(stats: Dict) -> None:
+    """Print the summary, repeat failures and write the run report at the end of a run."""
+    print_summary(stats)
+    log_connection_reuse()
+    log_run_io()
+    run_metrics.write_report(settings.get_run_report_file(), stats, {"engine": settings.threading.engine, "disk": run_io_stats.to_dict()})
 
-    stats = {
+    if stats["failed"] > 0:
+        logger.warning(f"Completed with {stats['failed']} failures:")
+        for failed_item in stats["failed_list"]:
+            logger.warning(f"  - {failed_item}")
+
+
+def create_stats() -> Dict:
+    """Create an empty statistics dict for a run."""
+    return {
         "total_processed": 0,
         "successful": 0,
         "skipped": 0,
+        "negative_cached": 0,
         "failed": 0,
         "drm_protected": 0,
         "drm_protected_list": [],
@@ -227,22 +450,78 @@ def run_download_mode() -> int:
         "successful_list": [],
     }
 
+
+def get_content_type(url: str) -> str:
+    """Get content type of a configured URL."""
+    return settings.constants.content_type_tv_shows if url in settings.tv_shows else settings.constants.content_type_movies
+
+
+def process_urls_concurrently(urls: List[str], stats: Dict, processed_slugs: set, discovered: Optional[Dict[str, Set[int]]] = None) -> None:
+    """Process URLs on a bounded pool so series metadata fetches of different shows overlap.
+
+    URLs of the same show stay together in one task, in config order, so duplicate
+    season URLs are still skipped once the show has been processed.
+    """
+    groups: Dict[str, List[str]] = {}
+    for url in urls:
+        groups.setdefault(extract_show_slug(url) or url, []).append(url)
+
+    def process_group(group: List[str]) -> None:
+        for url in group:
+            process_url(url, get_content_type(url), stats, processed_slugs, discovered)
+
+    workers = settings.threading.max_series_workers
+    logger.info(f"Processing {len(urls)} URLs ({len(groups)} shows) with {workers} series workers")
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(process_group, group) for group in groups.values()]
+        for future in as_completed(futures):
+            future.result()
+
+
+def run_download_mode(discover: bool = False) -> int:
+    """Run download mode.
+
+    URLs are resolved into queued episodes, and the queue (including anything
+    left over from an interrupted run) is downloaded in priority order. With
+    threading on, downloads start while later URLs are still being resolved, so
+    priority order holds among the episodes queued so far. With discover, season
+    IDs seen in the series responses are turned into new config URLs at the end,
+    so discovery costs no extra API requests.
+    """
+    all_urls = settings.tv_shows + settings.movies
+    logger.info(f"Total URLs to process: {len(all_urls)} (TV Shows: {len(settings.tv_shows)}, Movies: {len(settings.movies)})")
+
+    stats = create_stats()
     processed_slugs: set = set()
+    discovered: Optional[Dict[str, Set[int]]] = {} if discover else None
 
     try:
-        for url in all_urls:
-            content_type = settings.constants.content_type_tv_shows if url in settings.tv_shows else settings.constants.content_type_movies
-            process_url(url, content_type, stats, processed_slugs)
-
-        print_summary(stats)
+        if settings.threading.use_threading:
+            with ThreadPoolExecutor(max_workers=1) as executor:
+                with download_queue.filling():
+                    draining = executor.submit(drain_queue, stats)
+                    if settings.threading.max_series_workers > 1:
+                        process_urls_concurrently(all_urls, stats, processed_slugs, discovered)
+                    else:
+                        for url in all_urls:
+                            process_url(url, get_content_type(url), stats, processed_slugs, discovered)
+                    queue_drm_rechecks()
+                draining.result()
+        else:
+            for url in all_urls:
+                process_url(url, get_content_type(url), stats, processed_slugs, discovered)
+            queue_drm_rechecks()
+            drain_queue(stats)
+        finish_run(stats)
 
-        if stats["failed"] > 0:
-            logger.warning(f"Completed with {stats['failed']} failures:")
-            for failed_item in stats["failed_list"]:
-                logger.warning(f"  - {failed_item}")
+        if discovered is not None:
+            add_discovered_urls(discovered)
 
     except Exception as e:
         logger.error(f"Critical error: {str(e)}")
         return 1
+    finally:
+        cache.flush()
 
     return 0
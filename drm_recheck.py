@@ -0,0 +1,80 @@
+"""Schedule for re-checking DRM-protected episodes, in case ERR later publishes them without DRM."""
+
+import os
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from loguru import logger
+
+from state_store import load_state, save_state
+
+
+class DrmRecheckSchedule:
+    """Remembers when each DRM-protected episode was first seen and when to look at it again.
+
+    The first re-check happens initial_interval seconds after the episode was found
+    protected; every check that still finds DRM doubles the wait, up to
+    max_interval. Callers take only a small batch of due episodes per run, so the
+    API cost stays bounded however many protected episodes pile up.
+    """
+
+    def __init__(self, state_file: str, initial_interval: float, max_interval: float):
+        self.state_file = os.path.expanduser(state_file)
+        self.initial_interval = initial_interval
+        self.max_interval = max(max_interval, initial_interval)
+        self._episodes: Dict[str, Dict] = {}
+        self._lock = threading.Lock()
+        self.load()
+
+    def load(self) -> None:
+        """Load the schedule from file."""
+        self._episodes = load_state(self.state_file, "episodes", "DRM re-check schedule")
+        if self._episodes:
+            logger.debug(f"Loaded re-check schedule of {len(self._episodes)} DRM-protected episodes from {self.state_file}")
+
+    def save(self) -> None:
+        """Atomically write the schedule to file."""
+        save_state(self.state_file, "episodes", self._episodes, "DRM re-check schedule")
+
+    def track_many(self, entries: Iterable[Tuple[int, str, Optional[str]]]) -> None:
+        """Start scheduling (episode_id, content_type, series_name) entries not scheduled yet."""
+        now = time.time()
+        with self._lock:
+            added = 0
+            for episode_id, content_type, series_name in entries:
+                key = str(episode_id)
+                if key not in self._episodes:
+                    self._episodes[key] = self._entry(content_type, series_name, now, now, 0)
+                    added += 1
+            if added:
+                self.save()
+
+    def still_protected(self, episode_id: int, content_type: str, series_name: Optional[str]) -> None:
+        """Record a check that found DRM (or could not tell) and push the next one further out."""
+        now = time.time()
+        with self._lock:
+            previous = self._episodes.get(str(episode_id))
+            if previous is None:
+                entry = self._entry(content_type, series_name, now, now, 0)
+            else:
+                entry = self._entry(content_type, series_name or previous.get("series_name"), previous["first_seen"], now, previous["checks"] + 1)
+            self._episodes[str(episode_id)] = entry
+            self.save()
+
+    def due(self, limit: int) -> List[Tuple[int, Dict]]:
+        """Return up to limit episodes whose re-check is due, longest overdue first."""
+        now = time.time()
+        with self._lock:
+            due = sorted(((entry["next_check"], int(key), dict(entry)) for key, entry in self._episodes.items() if entry["next_check"] <= now))
+        return [(episode_id, entry) for _, episode_id, entry in due[:limit]]
+
+    def remove(self, episode_id: int) -> None:
+        """Stop scheduling an episode once it was downloaded."""
+        with self._lock:
+            if self._episodes.pop(str(episode_id), None) is not None:
+                self.save()
+
+    def _entry(self, content_type: str, series_name: Optional[str], first_seen: float, checked_at: float, checks: int) -> Dict:
+        interval = min(self.initial_interval * 2**checks, self.max_interval)
+        return {"content_type": content_type, "series_name": series_name, "first_seen": first_seen, "checks": checks, "next_check": checked_at + interval}
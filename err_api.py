@@ -1,6 +1,7 @@
 import re
 import os
 import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from typing import Optional, Tuple, List, Set, Dict
 import requests
 from requests.adapters import HTTPAdapter
@@ -9,6 +10,15 @@ from requests.exceptions import RequestException
 from loguru import logger
 from tenacity import retry, stop_after_attempt, wait_exponential, retry_if_exception_type, retry_if_exception
 from settings import settings
+from rate_limit import RETRY_AFTER_STATUSES, BandwidthGovernor, TokenBucket, parse_retry_after
+from api_cache import ApiResponseCache
+from disk_io import ChunkSizer, IoStats, iter_response, open_download_file, run_io_stats
+from run_metrics import count_retry, run_metrics
+from integrity import StreamVerifier
+from partial import accept_response, commit, discard, is_complete, part_path, partial_size, resume_headers, save_sidecar
+from transfers import TransferRegistry
+from negative_cache import GEO_RESTRICTED, NO_MEDIA, REASON_LABELS, REMOVED, NegativeCache
+from segmented import STATE_SUFFIX, RangeNotSupported, download_segmented, if_range_validator, probe_size
 
 API_BASE_URL = "https://services.err.ee/api/v2/vodContent/getContentPageData?contentId={}"
 
@@ -18,45 +28,158 @@ adapter = HTTPAdapter(pool_connections=10, pool_maxsize=10, max_retries=0)
 session.mount("https://", adapter)
 session.mount("http://", adapter)
 
+# Separate pool for CDN transfers, sized so every segment of every download slot (plus a
+# Range probe) can keep its connection alive
+media_session = requests.Session()
+media_session.headers.update({"Connection": "keep-alive", "Accept-Encoding": "identity"})
+media_adapter = HTTPAdapter(pool_connections=4, pool_maxsize=settings.threading.get_max_workers() * max(settings.download.segments, 1) + 1, max_retries=0)
+media_session.mount("https://", media_adapter)
+media_session.mount("http://", media_adapter)
 
-def _is_server_error(exception):
-    """Check if exception is a server-side HTTP error (5xx)."""
+# One budget for every thread (and the asyncio engine) talking to services.err.ee
+api_limiter = TokenBucket(settings.retry.get_api_rate(), settings.retry.api_burst)
+
+bandwidth = BandwidthGovernor(settings.bandwidth.get_max_rate, settings.bandwidth.burst_seconds)
+
+transfers = TransferRegistry(settings.get_state_file("transfers.json"), settings.download.partial_max_age_days * 86400)
+
+negative_cache = NegativeCache(
+    settings.get_state_file("negative_cache.json"),
+    {
+        REMOVED: settings.cache.negative_removed_hours * 3600,
+        NO_MEDIA: settings.cache.negative_no_media_hours * 3600,
+        GEO_RESTRICTED: settings.cache.negative_geo_hours * 3600,
+    },
+)
+
+# HTTP statuses of the content page API that are remembered in the negative cache
+NEGATIVE_STATUSES = {404: REMOVED, 403: GEO_RESTRICTED, 451: GEO_RESTRICTED}
+
+api_cache = (
+    ApiResponseCache(settings.cache.api_dir or settings.get_state_file("api_cache"), settings.cache.api_ttl, settings.cache.api_max_age_days * 86400)
+    if settings.cache.api_responses
+    else None
+)
+
+
+def _is_retryable_error(exception):
+    """Check if exception is a server-side (5xx) or rate limit (429) HTTP error."""
     return (
         isinstance(exception, requests.HTTPError)
         and exception.response is not None
-        and exception.response.status_code >= 500
+        and (exception.response.status_code >= 500 or exception.response.status_code == 429)
     )
 
 
 @retry(
     stop=stop_after_attempt(3),
     wait=wait_exponential(multiplier=1, min=2, max=30),
-    retry=retry_if_exception(_is_server_error),
+    retry=retry_if_exception(_is_retryable_error),
+    before_sleep=count_retry("api"),
     reraise=True,
 )
-def _api_get(url: str, timeout: int) -> requests.Response:
-    """Make API GET request with retry on 5xx errors and rate limiting."""
-    time.sleep(settings.retry.api_delay)
-    response = session.get(url, timeout=timeout)
+def _api_get(url: str, timeout: int, headers: Optional[Dict[str, str]] = None) -> requests.Response:
+    """Make API GET request with retry on 5xx/429 errors and shared rate limiting."""
+    api_limiter.acquire()
+    response = session.get(url, timeout=timeout, headers=headers)
+    # elapsed ends when the headers arrive, matching what the asyncio engine measures
+    run_metrics.observe("api_latency_seconds", response.elapsed.total_seconds())
+    run_metrics.count("api_requests")
+    if response.status_code in RETRY_AFTER_STATUSES:
+        retry_after = parse_retry_after(response.headers.get("Retry-After"))
+        if retry_after:
+            logger.warning(f"API asks to back off for {retry_after:.0f}s (HTTP {response.status_code})")
+            api_limiter.pause(retry_after)
     response.raise_for_status()
     return response
 
 
+def get_connection_reuse(pooled_adapter: HTTPAdapter) -> Tuple[int, int]:
+    """Return (requests, new connections) summed over the adapter's live connection pools."""
+    pools = pooled_adapter.poolmanager.pools
+    requests_made = connections = 0
+    for key in pools.keys():
+        pool = pools.get(key)
+        if pool is not None:
+            requests_made += pool.num_requests
+            connections += pool.num_connections
+    return requests_made, connections
+
+
+def log_connection_reuse() -> None:
+    """Log how many requests reused a pooled keep-alive connection."""
+    for name, pooled_adapter in (("API", adapter), ("Media", media_adapter)):
+        requests_made, connections = get_connection_reuse(pooled_adapter)
+        if requests_made:
+            reuse_rate = 1 - connections / requests_made
+            logger.info(f"{name} connections: {requests_made} requests over {connections} connections ({reuse_rate:.0%} reused)")
+
+
+def fetch_content_page(content_id: int, timeout: int, cached: bool = True) -> dict:
+    """Fetch getContentPageData for a content ID, using the on-disk response cache when enabled and cached is set.
+
+    Fresh entries are returned without a request; stale ones are revalidated with a
+    conditional GET and reused on 304 Not Modified. Episode lookups pass
+    cached=False: a page is looked up once before its episode is downloaded, so
+    storing it would only fill the disk.
+    """
+    response_cache = api_cache if cached else None
+    entry = response_cache.get(content_id) if response_cache else None
+    if entry and response_cache.is_fresh(entry):
+        logger.debug(f"API cache hit for content_id: {content_id}")
+        return entry["data"]
+
+    response = _api_get(API_BASE_URL.format(content_id), timeout, headers=ApiResponseCache.conditional_headers(entry))
+    if response.status_code == 304 and entry:
+        logger.debug(f"API response not modified for content_id: {content_id}")
+        response_cache.touch(content_id, entry)
+        return entry["data"]
+
+    data = response.json()
+    if response_cache:
+        response_cache.store(content_id, data, response.headers.get("ETag"), response.headers.get("Last-Modified"))
+    return data
+
+
 def is_drm_protected(media_data: dict) -> bool:
     """Check if media is DRM protected."""
     restrictions = media_data.get("restrictions", {})
     return restrictions.get("drm", False)
 
 
+def remembered_missing(content_id: int, reasons: Tuple[str, ...] = (REMOVED, NO_MEDIA, GEO_RESTRICTED)) -> Optional[str]:
+    """Return the negative cache reason for a content ID if it is one of reasons, logging the skip."""
+    reason = negative_cache.get(content_id)
+    if reason not in reasons:
+        return None
+    logger.info(f"Sisu on meeles kui puuduv ({REASON_LABELS[reason]}), API päring vahele jäetud - ID: {content_id}")
+    return reason
+
+
+def remember_http_error(content_id: int, status: int) -> None:
+    """Put a content ID in the negative cache if the API answered with a status that means nothing to download."""
+    reason = NEGATIVE_STATUSES.get(status)
+    if reason:
+        negative_cache.add(content_id, reason)
+
+
+def remember_missing_media(content_id: int, data: dict) -> None:
+    """Put a content ID in the negative cache if its page lists no media."""
+    if not data.get("data", {}).get("mainContent", {}).get("medias"):
+        negative_cache.add(content_id, NO_MEDIA)
+
+
 def fetch_video_api_data(content_id: int) -> Optional[dict]:
-    """Fetch raw video data from ERR API."""
+    """Fetch raw video data from ERR API, unless the content ID is remembered as missing."""
+    if remembered_missing(content_id):
+        return None
+
     try:
-        url = API_BASE_URL.format(content_id)
         logger.info(f"Fetching video details for content_id: {content_id}")
 
-        response = _api_get(url, timeout=settings.download.timeout_max)
-        return response.json()
+        return fetch_content_page(content_id, timeout=settings.download.timeout_max, cached=False)
     except requests.HTTPError as e:
+        remember_http_error(content_id, e.response.status_code)
         if e.response.status_code == 404:
             logger.warning(f"Sisu ei ole enam saadaval ERRis (404) - ID: {content_id}. Sisu on tõenäoliselt ERRist eemaldatud või arhiveeritud.")
         else:
@@ -144,12 +267,41 @@ def parse_video_details(data: dict, content_id: int, content_type: str) -> Tuple
         return None, None, None
 
 
-def get_video_details(content_id: int, content_type: str) -> Tuple[Optional[str], Optional[str], Optional[str]]:
-    """Fetch and parse video details from ERR API."""
+def details_from_metadata(metadata: Optional[dict], content_id: int, content_type: str) -> Optional[Tuple[Optional[str], Optional[str], Optional[str]]]:
+    """Build video details from fields captured in a series response.
+
+    Returns None unless every field the API response would contribute is there,
+    so the file name is the same either way. The first media must carry its
+    restrictions too: is_drm_protected reads a missing one as "no DRM", and the
+    episode page always has it.
+    """
+    if not metadata or not metadata.get("medias") or "heading" not in metadata or "year" not in metadata:
+        return None
+
+    media = metadata["medias"][0]
+    if not isinstance(media, dict) or "restrictions" not in media or "src" not in media:
+        return None
+
+    numbered = content_type == settings.constants.content_type_tv_shows and metadata.get("season", 0) > 0 and metadata.get("episode", 0) > 0
+    if not numbered and "statsHeading" not in metadata:
+        return None
+
+    details = parse_video_details({"data": {"mainContent": metadata}}, content_id, content_type)
+    return details if details[0] else None
+
+
+def get_video_details(content_id: int, content_type: str, metadata: Optional[dict] = None) -> Tuple[Optional[str], Optional[str], Optional[str]]:
+    """Fetch and parse video details from ERR API, unless the series response already provided them."""
+    details = details_from_metadata(metadata, content_id, content_type)
+    if details:
+        logger.debug(f"Using series listing metadata for content_id: {content_id}")
+        return details
+
     data = fetch_video_api_data(content_id)
     if not data:
         return None, None, None
 
+    remember_missing_media(content_id, data)
     return parse_video_details(data, content_id, content_type)
 
 
@@ -165,7 +317,10 @@ def get_file_paths(heading: str, file_title: str, content_type: str) -> Tuple[st
 
 
 def check_file_exists(file_path: str, file_title: str, heading: str) -> bool:
-    """Check if file exists and log if skipping."""
+    """Check if file exists and log if skipping.
+
+    Downloads are renamed to file_path only after verification, so any file there is complete.
+    """
     if os.path.exists(file_path):
         file_size = os.path.getsize(file_path)
         if file_size > 0:
@@ -187,50 +342,136 @@ def should_skip_download(final_file_path: str, file_title: str, heading: str, sk
     stop=stop_after_attempt(settings.retry.max_attempts),
     wait=wait_exponential(multiplier=settings.retry.wait_multiplier, min=settings.retry.wait_min, max=settings.retry.wait_max),
     retry=retry_if_exception_type((RequestException, IOError)),
+    before_sleep=count_retry("download"),
 )
-def download_file_with_progress(url: str, file_path: str, file_title: str) -> bool:
-    """Download file from URL with progress bar and resume support."""
+def download_file_with_progress(url: str, file_path: str, file_title: str) -> Tuple[int, Optional[str]]:
+    """Download file from URL into the .part file file_path with progress bar and resume support.
+
+    Returns (size, sha256) of the finished file. Raises IntegrityError if the
+    stream ends short of the size the server announced.
+    """
     try:
-        existing_size = os.path.getsize(file_path) if os.path.exists(file_path) else 0
-        headers = {"Range": f"bytes={existing_size}-"} if existing_size > 0 else {}
+        existing_size = partial_size(file_path)
+        if is_complete(file_path, existing_size):
+            logger.info("Partial file is already complete")
+            verifier = StreamVerifier.from_prefix(file_path, existing_size, existing_size, settings.download.verify_hash)
+            return verifier.size, verifier.digest
+
+        headers = resume_headers(file_path, existing_size)
 
         if existing_size > 0:
             logger.info(f"Resuming from {existing_size / (1024 * 1024):.1f} MB")
 
-        response = requests.get(url, stream=True, timeout=(10, 30), headers=headers)
+        # Closing the response hands the connection back to the media pool for the next episode
+        requested = time.perf_counter()
+        with media_session.get(url, stream=True, timeout=(10, 30), headers=headers) as response:
+            run_metrics.observe("ttfb_seconds", time.perf_counter() - requested)
+            response.raise_for_status()
+            existing_size, total = accept_response(file_path, existing_size, response.status_code, response.headers)
+
+            mode = "ab" if existing_size > 0 else "wb"
+            verifier = StreamVerifier.from_prefix(file_path, existing_size, total, settings.download.verify_hash)
+            io_stats = IoStats()
+            sizer = ChunkSizer(settings.download.chunk_size, settings.download.max_chunk_size) if settings.download.adaptive_chunks else None
+            started = time.perf_counter()
+
+            with open_download_file(file_path, mode, settings.download.write_buffer, io_stats, settings.download.fadvise) as file:
+                with tqdm(total=total, initial=existing_size, unit="B", unit_scale=True, desc=file_title) as pbar:
+                    for chunk in iter_response(response, sizer, settings.download.chunk_size, io_stats):
+                        file.write(chunk)
+                        verifier.update(chunk)
+                        pbar.update(len(chunk))
+                        bandwidth.consume(len(chunk))
 
-        # Server doesn't support resume, start from beginning
-        if existing_size > 0 and response.status_code == 200:
-            existing_size = 0
-            logger.warning("Server doesn't support resume, starting fresh")
+            io_stats.bytes = verifier.size - existing_size
+            io_stats.seconds = time.perf_counter() - started
+            run_io_stats.merge(io_stats)
+            run_metrics.transfer(io_stats.bytes, io_stats.seconds)
+            run_metrics.observe("write_seconds", io_stats.write_seconds)
+            logger.info(f"Wrote {io_stats.describe()}")
 
-        response.raise_for_status()
+        verifier.verify()
+        return verifier.size, verifier.digest
+    except RequestException as e:
+        logger.error(f"Download failed - Network error: {str(e)}")
+        raise
+    except IOError as e:
+        logger.error(f"Download failed - File error: {str(e)}")
+        raise
 
-        if response.status_code == 206:
-            content_range = response.headers.get("Content-Range", "")
-            total = int(content_range.split("/")[-1]) if "/" in content_range else 0
-        else:
-            total = int(response.headers.get("content-length", 0))
 
-        mode = "ab" if existing_size > 0 else "wb"
+@retry(
+    stop=stop_after_attempt(settings.retry.max_attempts),
+    wait=wait_exponential(multiplier=settings.retry.wait_multiplier, min=settings.retry.wait_min, max=settings.retry.wait_max),
+    retry=retry_if_exception_type((RequestException, IOError)),
+    before_sleep=count_retry("download"),
+)
+def download_file_segmented(
+    url: str, file_path: str, file_title: str, total: int, etag: Optional[str] = None, last_modified: Optional[str] = None
+) -> Tuple[int, Optional[str]]:
+    """Download file over parallel Range requests; each retry continues the unfinished segments.
 
-        with open(file_path, mode) as file:
-            with tqdm(total=total, initial=existing_size, unit="B", unit_scale=True, desc=file_title) as pbar:
-                for chunk in response.iter_content(chunk_size=settings.download.chunk_size):
-                    if chunk:
-                        file.write(chunk)
-                        pbar.update(len(chunk))
-        return True
+    Segments arrive out of order, so only the size is verified (sha256 is None).
+    etag and last_modified come from the Range probe and guard resumed segments.
+    """
+    try:
+        save_sidecar(file_path, total, etag, last_modified)
+        download_segmented(
+            media_session,
+            url,
+            file_path,
+            file_title,
+            total,
+            settings.download.segments,
+            settings.download.chunk_size,
+            bandwidth.consume,
+            if_range_validator(etag, last_modified),
+        )
+        return total, None
     except RequestException as e:
-        logger.error(f"Download failed - Network error: {str(e)}")
+        logger.error(f"Segmented download failed - Network error: {str(e)}")
         raise
     except IOError as e:
-        logger.error(f"Download failed - File error: {str(e)}")
+        logger.error(f"Segmented download failed - File error: {str(e)}")
         raise
 
 
-def download_mp4(heading: str, file_title: str, mp4_url: str, content_type: str, skip_existing: bool = True) -> tuple[str, str] | str | bool:
-    """Download MP4 file. Returns (status, file_path) tuple, or False on failure."""
+def download_file(url: str, file_path: str, file_title: str) -> Tuple[int, Optional[str]]:
+    """Download file into the .part file file_path, splitting it into parallel segments when enabled and the file is large enough.
+
+    Falls back to the single-stream path when the server does not answer Range
+    requests with 206.
+    """
+    has_segment_state = os.path.exists(file_path + STATE_SUFFIX)
+    if settings.download.segments > 1 and (has_segment_state or not os.path.exists(file_path)):
+        try:
+            total, etag, last_modified = probe_size(media_session, url)
+            if total and (has_segment_state or total >= settings.download.segment_min_size):
+                return download_file_segmented(url, file_path, file_title, total, etag, last_modified)
+            if not total:
+                logger.info("Server doesn't support Range requests, downloading as a single stream")
+        except RangeNotSupported as e:
+            logger.warning(f"{e}, falling back to a single stream")
+        except RequestException as e:
+            logger.warning(f"Range probe failed ({str(e)}), falling back to a single stream")
+
+    # A preallocated segmented file would look like a finished single-stream prefix
+    if os.path.exists(file_path + STATE_SUFFIX):
+        discard(file_path)
+
+    return download_file_with_progress(url, file_path, file_title)
+
+
+def download_mp4(
+    heading: str, file_title: str, mp4_url: str, content_type: str, skip_existing: bool = True, episode_id: Optional[int] = None
+) -> tuple | str | bool:
+    """Download MP4 file.
+
+    Returns ("success", file_path, size, sha256) after a verified download,
+    (download_skipped, file_path) for an existing file, or False on failure.
+    With episode_id, an unfinished download is kept in the transfer registry
+    and resumed by a later run.
+    """
     final_folder_path, final_file_path = get_file_paths(heading, file_title, content_type)
 
     if should_skip_download(final_file_path, file_title, heading, skip_existing):
@@ -239,32 +480,40 @@ def download_mp4(heading: str, file_title: str, mp4_url: str, content_type: str,
     logger.info(f"Starting download: [{heading}] {file_title}")
 
     os.makedirs(final_folder_path, exist_ok=True)
+    part_file = part_path(final_file_path)
+    if episode_id:
+        transfers.adopt(episode_id, part_file)
 
     try:
-        download_file_with_progress(mp4_url, final_file_path, file_title)
+        size, digest = download_file(mp4_url, part_file, file_title)
+        commit(part_file, final_file_path)
+        if episode_id:
+            transfers.remove(episode_id)
         logger.success(f"Download completed: [{heading}] {file_title}")
-        return ("success", final_file_path)
+        return ("success", final_file_path, size, digest)
     except Exception:
-        if os.path.exists(final_file_path):
-            os.remove(final_file_path)
-            logger.warning(f"Deleted partial file: {final_file_path}")
+        if os.path.exists(part_file):
+            logger.warning(f"Keeping partial file for the next attempt: {part_file}")
+            if episode_id:
+                transfers.record(episode_id, part_file, mp4_url)
         return False
 
 
-def run_download(video_content_id: int, content_type: str, series_name: Optional[str] = None) -> str | bool:
-    """Execute download for a single video."""
+def prepare_download(
+    video_content_id: int, content_type: str, series_name: Optional[str] = None, metadata: Optional[dict] = None
+) -> Tuple[str, str, str] | str | bool:
+    """Resolve a video to (folder, file title, MP4 URL). Returns drm_protected or False if it cannot be downloaded."""
     if not isinstance(video_content_id, int) or video_content_id <= 0:
         logger.error("Invalid video content ID")
         return False
 
-    folder_name, file_name, video_url = get_video_details(video_content_id, content_type)
+    folder_name, file_name, video_url = get_video_details(video_content_id, content_type, metadata)
 
     if folder_name == settings.constants.drm_protected:
         return settings.constants.drm_protected
 
     if all((folder_name, file_name, video_url)):
-        final_folder = series_name if series_name else folder_name
-        return download_mp4(final_folder, file_name, video_url, content_type, settings.download.skip_existing)  # type: ignore
+        return (series_name if series_name else folder_name, file_name, video_url)  # type: ignore
 
     logger.error(f"Failed to get video details for ID: {video_content_id}")
     return False
@@ -290,42 +539,183 @@ def extract_video_id(url: str) -> Optional[int]:
         return None
 
 
-def get_all_episodes_from_series(series_id: int) -> Tuple[Optional[str], List[int]]:
-    """Get all episode IDs from a series. Returns (series_name, episode_ids)."""
-    try:
-        url = API_BASE_URL.format(series_id)
-        logger.info(f"Fetching series data for ID: {series_id}")
+def get_lazy_season_ids(data: dict) -> List[int]:
+    """Return firstContentId of every season listed without its episodes."""
+    items = data.get("data", {}).get("seasonList", {}).get("items", []) or []
+    return [season["firstContentId"] for season in items if "contents" not in season and "firstContentId" in season]
 
-        response = _api_get(url, timeout=settings.download.timeout_max)
-        data = response.json()
-        series_name = data.get("data", {}).get("mainContent", {}).get("statsSeriesTitle", "").replace(".", "")
-        episode_ids = []
 
-        season_list = data.get("data", {}).get("seasonList", {})
-        if season_list and "items" in season_list:
-            total_seasons = len(season_list["items"])
-            logger.info(f"Found {total_seasons} seasons")
+def find_season_contents(page: dict, first_id: int) -> Optional[List[dict]]:
+    """Find the episode list of the season containing first_id in a content page's seasonList."""
+    for season in page.get("data", {}).get("seasonList", {}).get("items", []) or []:
+        contents = season.get("contents")
+        if contents and any(content.get("id") == first_id for content in contents):
+            return contents
+    return None
+
+
+def attach_season_contents(data: dict, contents_by_first_id: Dict[int, List[dict]]) -> None:
+    """Fill in the episodes of lazily listed seasons in a series response."""
+    for season in data.get("data", {}).get("seasonList", {}).get("items", []) or []:
+        first_id = season.get("firstContentId")
+        if "contents" not in season and first_id in contents_by_first_id:
+            season["contents"] = contents_by_first_id[first_id]
+
+
+def get_season_episode_ids(data: dict) -> Dict[int, List[int]]:
+    """Return the episode IDs of every season in a series response, keyed by the season's first content ID."""
+    seasons: Dict[int, List[int]] = {}
+    for season in data.get("data", {}).get("seasonList", {}).get("items", []) or []:
+        contents = season.get("contents") or []
+        first_id = season.get("firstContentId") or (contents[0].get("id") if contents else None)
+        if first_id:
+            seasons[first_id] = [content["id"] for content in contents if content.get("id")] or [first_id]
+    return seasons
+
+
+def reuse_known_seasons(data: dict, known_seasons: Optional[Dict[int, List[int]]]) -> List[int]:
+    """Fill in lazily listed seasons whose episodes are already known, and return the first IDs still to fetch.
+
+    The last season in the list is always fetched, since that is where new episodes appear.
+    """
+    first_ids = get_lazy_season_ids(data)
+    if not known_seasons or not first_ids:
+        return first_ids
+
+    newest_id = data["data"]["seasonList"]["items"][-1].get("firstContentId")
+    reused = {first_id: known_seasons[first_id] for first_id in first_ids if first_id in known_seasons and first_id != newest_id}
+    if reused:
+        logger.info(f"{len(reused)} seasons unchanged since the last run, not fetched again")
+        attach_season_contents(data, {first_id: [{"id": ep_id} for ep_id in ids] for first_id, ids in reused.items()})
+    return [first_id for first_id in first_ids if first_id not in reused]
+
+
+def expand_lazy_seasons(data: dict, known_seasons: Optional[Dict[int, List[int]]] = None) -> None:
+    """Fetch seasons that only carry firstContentId so every episode is enumerated in one pass.
+
+    Season pages are fetched concurrently through the rate limiter and response
+    cache. A season that fails to load keeps contributing only its first episode.
+    Seasons found in known_seasons (first content ID -> episode IDs) are taken
+    from there instead, see reuse_known_seasons.
+    """
+    if not settings.download.expand_seasons:
+        return
+    first_ids = reuse_known_seasons(data, known_seasons)
+    if not first_ids:
+        return
+
+    logger.info(f"Fetching {len(first_ids)} seasons listed without episodes")
+
+    def fetch_season(first_id: int) -> Optional[List[dict]]:
+        try:
+            return find_season_contents(fetch_content_page(first_id, timeout=settings.download.timeout_max), first_id)
+        except (RequestException, ValueError) as e:
+            logger.warning(f"Failed to fetch season starting at ID {first_id}: {str(e)}")
+            return None
+
+    with ThreadPoolExecutor(max_workers=min(settings.threading.api_workers, len(first_ids))) as executor:
+        results = dict(zip(first_ids, executor.map(fetch_season, first_ids)))
+
+    attach_season_contents(data, {first_id: contents for first_id, contents in results.items() if contents})
+
+
+EPISODE_METADATA_FIELDS = ("heading", "statsHeading", "season", "episode", "year", "medias")
+
+
+def collect_episode_metadata(data: dict, content_id: int) -> Dict[int, dict]:
+    """Collect the per-episode fields present in a series response, keyed by episode ID.
+
+    Season contents usually carry only some of them; the page's own mainContent
+    (the episode the URL points at) carries all of them.
+    """
+    metadata: Dict[int, dict] = {}
+    for season in data.get("data", {}).get("seasonList", {}).get("items", []) or []:
+        for content in season.get("contents") or []:
+            fields = {field: content[field] for field in EPISODE_METADATA_FIELDS if content.get(field) is not None}
+            if fields and content.get("id"):
+                metadata[content["id"]] = fields
 
-            for season in season_list["items"]:
-                season_name = season.get("name", "Unknown")
-                season_count = 0
+    main_content = data.get("data", {}).get("mainContent", {})
+    if main_content.get("medias"):
+        metadata[content_id] = {field: main_content[field] for field in EPISODE_METADATA_FIELDS if main_content.get(field) is not None}
+    return metadata
 
-                if "contents" in season:
-                    for content in season["contents"]:
-                        episode_ids.append(content["id"])
-                        season_count += 1
-                elif "firstContentId" in season:
-                    first_id = season["firstContentId"]
-                    episode_ids.append(first_id)
-                    season_count = 1
 
-                logger.info(f"Season '{season_name}': {season_count} episodes")
+def parse_series_data(data: dict) -> Tuple[str, List[int]]:
+    """Parse series name and episode IDs from a series API response."""
+    series_name = data.get("data", {}).get("mainContent", {}).get("statsSeriesTitle", "").replace(".", "")
+    episode_ids = []
 
-            logger.success(f"Total: {len(episode_ids)} episodes from all seasons")
+    season_list = data.get("data", {}).get("seasonList", {})
+    if season_list and "items" in season_list:
+        total_seasons = len(season_list["items"])
+        logger.info(f"Found {total_seasons} seasons")
 
-        return series_name, episode_ids
+        for season in season_list["items"]:
+            season_name = season.get("name", "Unknown")
+            season_count = 0
+
+            if "contents" in season:
+                for content in season["contents"]:
+                    episode_ids.append(content["id"])
+                    season_count += 1
+            elif "firstContentId" in season:
+                first_id = season["firstContentId"]
+                episode_ids.append(first_id)
+                season_count = 1
+
+            logger.info(f"Season '{season_name}': {season_count} episodes")
+
+        logger.success(f"Total: {len(episode_ids)} episodes from all seasons")
+
+    return series_name, episode_ids
+
+
+def get_season_first_ids(data: dict) -> List[int]:
+    """Return the firstContentId of every season in a series response."""
+    items = data.get("data", {}).get("seasonList", {}).get("items", []) or []
+    return [season["firstContentId"] for season in items if season.get("firstContentId")]
+
+
+def build_season_url(content_id: int, show_slug: str) -> str:
+    """Build the lasteekraan URL of a season for the config."""
+    return f"https://lasteekraan.err.ee/{content_id}/{show_slug}"
+
+
+def get_all_episodes_from_series(
+    series_id: int, season_ids: Optional[Set[int]] = None, episode_metadata: Optional[Dict[int, dict]] = None, seasons: Optional[Dict[int, List[int]]] = None
+) -> Tuple[Optional[str], List[int]]:
+    """Get all episode IDs from a series. Returns (series_name, episode_ids).
+
+    If season_ids is given, the first content ID of every season is added to it,
+    which lets a download run double as URL discovery. If episode_metadata is
+    given, it receives the per-episode fields found in the response (see
+    collect_episode_metadata) so downloads can skip their own API lookup. If
+    seasons is given, lazily listed seasons it already holds are not fetched
+    again, and afterwards it holds the episode IDs of every season.
+    """
+    # An episode without media can still carry the series listing, so only page-level failures count here
+    reason = remembered_missing(series_id, (REMOVED, GEO_RESTRICTED))
+    if reason:
+        return (settings.constants.content_not_found_404 if reason == REMOVED else None), []
+
+    try:
+        url = API_BASE_URL.format(series_id)
+        logger.info(f"Fetching series data for ID: {series_id}")
+
+        data = fetch_content_page(series_id, timeout=settings.download.timeout_max)
+        if season_ids is not None:
+            season_ids.update(get_season_first_ids(data))
+        expand_lazy_seasons(data, seasons)
+        if episode_metadata is not None:
+            episode_metadata.update(collect_episode_metadata(data, series_id))
+        if seasons is not None:
+            seasons.clear()
+            seasons.update(get_season_episode_ids(data))
+        return parse_series_data(data)
 
     except requests.HTTPError as e:
+        remember_http_error(series_id, e.response.status_code)
         if e.response.status_code == 404:
             logger.warning(
                 f"Sarja ei ole enam saadaval ERRis ({settings.constants.content_not_found_404}) - ID: {series_id}. Sari {url} on tõenäoliselt ERRist eemaldatud või arhiveeritud."
@@ -353,19 +743,9 @@ def get_season_urls_from_api(content_id: int, show_slug: str) -> Set[str]:
     found_urls: Set[str] = set()
 
     try:
-        url = API_BASE_URL.format(content_id)
-        response = session.get(url, timeout=10)
-        if response.status_code != 200:
-            return found_urls
-
-        data = response.json()
-        season_list = data.get("data", {}).get("seasonList", {})
-
-        for season in season_list.get("items", []):
-            first_id = season.get("firstContentId")
-            if first_id:
-                new_url = f"https://lasteekraan.err.ee/{first_id}/{show_slug}"
-                found_urls.add(new_url)
+        data = fetch_content_page(content_id, timeout=10)
+        for first_id in get_season_first_ids(data):
+            found_urls.add(build_season_url(first_id, show_slug))
 
     except Exception as e:
         logger.debug(f"API error for {content_id}: {e}")
@@ -373,6 +753,32 @@ def get_season_urls_from_api(content_id: int, show_slug: str) -> Set[str]:
     return found_urls
 
 
+def discover_show_season_urls(slug: str, existing_urls: Set[str]) -> Set[str]:
+    """Collect season URLs of one show.
+
+    Every URL of a show returns the same seasonList, so a URL whose content ID was
+    already listed as a season start by an earlier response is not requested again.
+    """
+    start = time.monotonic()
+    found_urls: Set[str] = set()
+    covered_ids: Set[int] = set()
+    requests_made = 0
+
+    for url in sorted(existing_urls):
+        vid = extract_video_id(url)
+        if not vid or vid in covered_ids:
+            continue
+
+        season_urls = get_season_urls_from_api(vid, slug)
+        requests_made += 1
+        found_urls.update(season_urls)
+        covered_ids.add(vid)
+        covered_ids.update(season_id for season_id in map(extract_video_id, season_urls) if season_id)
+
+    logger.info(f"Kontrollitud: {slug.replace('-', ' ')} ({requests_made}/{len(existing_urls)} päringut, {time.monotonic() - start:.1f}s)")
+    return found_urls
+
+
 def discover_missing_urls(tv_show_urls: List[str]) -> Dict[str, Set[str]]:
     """
     Discover missing season URLs for TV shows.
@@ -394,27 +800,25 @@ def discover_missing_urls(tv_show_urls: List[str]) -> Dict[str, Set[str]]:
             existing_ids.add(str(vid))
 
     missing_by_show: Dict[str, Set[str]] = {}
-
-    for slug, existing_urls in existing_by_show.items():
-        logger.info(f"Kontrollin: {slug.replace('-', ' ')}")
-
-        found_urls: Set[str] = set()
-        for url in existing_urls:
-            vid = extract_video_id(url)
-            if vid:
-                season_urls = get_season_urls_from_api(vid, slug)
-                found_urls.update(season_urls)
-
-        missing: Set[str] = set()
-        for url in found_urls:
-            vid = extract_video_id(url)
-            if vid and str(vid) not in existing_ids:
-                missing.add(url)
-
-        if missing:
-            missing_by_show[slug] = missing
-            logger.success(f"Leitud {len(missing)} uut URL-i: {slug.replace('-', ' ')}")
-            for url in sorted(missing):
-                logger.success(f"  {url}")
+    workers = settings.threading.max_series_workers
+    logger.info(f"Kontrollin {len(existing_by_show)} sarja, {workers} korraga")
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = {executor.submit(discover_show_season_urls, slug, urls): slug for slug, urls in existing_by_show.items()}
+        for future in as_completed(futures):
+            slug = futures[future]
+            found_urls = future.result()
+
+            missing: Set[str] = set()
+            for url in found_urls:
+                vid = extract_video_id(url)
+                if vid and str(vid) not in existing_ids:
+                    missing.add(url)
+
+            if missing:
+                missing_by_show[slug] = missing
+                logger.success(f"Leitud {len(missing)} uut URL-i: {slug.replace('-', ' ')}")
+                for url in sorted(missing):
+                    logger.success(f"  {url}")
 
     return missing_by_show
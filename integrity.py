@@ -0,0 +1,57 @@
+"""Size and hash verification of downloads computed while the bytes stream to disk."""
+
+import hashlib
+from typing import Optional
+
+HASH_READ_SIZE = 1024 * 1024
+
+
+class IntegrityError(IOError):
+    """Downloaded data does not match what the server announced."""
+
+
+class StreamVerifier:
+    """Counts and hashes chunks as they are written, so a finished file is verified without reading it back.
+
+    When a download resumes, the bytes already on disk are hashed once up front
+    (from_prefix); everything after that is hashed from the network buffers.
+    """
+
+    def __init__(self, expected_size: Optional[int] = None, hashing: bool = True):
+        self.expected_size = expected_size or None
+        self.size = 0
+        self._hash = hashlib.sha256() if hashing else None
+
+    @classmethod
+    def from_prefix(cls, file_path: str, prefix_size: int, expected_size: Optional[int] = None, hashing: bool = True) -> "StreamVerifier":
+        """Start a verifier for a resumed download, seeded with the first prefix_size bytes of file_path."""
+        verifier = cls(expected_size, hashing)
+        if verifier._hash is None or prefix_size <= 0:
+            verifier.size = max(prefix_size, 0)
+            return verifier
+
+        with open(file_path, "rb") as f:
+            remaining = prefix_size
+            while remaining > 0:
+                block = f.read(min(HASH_READ_SIZE, remaining))
+                if not block:
+                    break
+                verifier.update(block)
+                remaining -= len(block)
+        return verifier
+
+    def update(self, chunk: bytes) -> None:
+        """Account for a chunk that was just written."""
+        self.size += len(chunk)
+        if self._hash is not None:
+            self._hash.update(chunk)
+
+    @property
+    def digest(self) -> Optional[str]:
+        """Hex SHA-256 of everything seen so far, or None if hashing is off."""
+        return self._hash.hexdigest() if self._hash is not None else None
+
+    def verify(self) -> None:
+        """Raise IntegrityError if the stream ended before (or after) the announced size."""
+        if self.expected_size is not None and self.size != self.expected_size:
+            raise IntegrityError(f"Received {self.size} of {self.expected_size} bytes")
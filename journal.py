@@ -0,0 +1,82 @@
+"""Append-only JSON-lines journals for state files that change one record at a time."""
+
+import json
+import os
+from typing import IO, Any, Callable, Dict, Iterable, Optional
+
+from loguru import logger
+
+
+class Journal:
+    """One JSON record per line, written through a single open handle.
+
+    Every append is flushed to the OS before it returns, so a killed process loses
+    nothing. Not thread-safe on its own: the owning store serializes access with
+    its lock, replays the journal on load and truncates it after writing a
+    snapshot.
+    """
+
+    def __init__(self, path: str, label: str):
+        self.path = path
+        self.label = label  # Names the journal in log messages, e.g. "cache journal"
+        self.records = 0
+        self._handle: Optional[IO[str]] = None
+
+    def replay(self, apply: Callable[[Dict[str, Any]], None]) -> bool:
+        """Pass every record to apply in order. Returns True if a torn record was found."""
+        self.records = 0
+        if not os.path.exists(self.path):
+            return False
+
+        try:
+            with open(self.path, "r") as f:
+                for line in f:
+                    if not line.strip():
+                        continue
+                    try:
+                        record = json.loads(line)
+                    except json.JSONDecodeError:
+                        logger.warning(f"Ignoring torn journal record after {self.records} entries in {self.path}")
+                        return True
+                    apply(record)
+                    self.records += 1
+        except IOError as e:
+            logger.warning(f"Failed to replay {self.label}: {e}")
+        return False
+
+    def append(self, records: Iterable[Dict[str, Any]]) -> None:
+        """Append records and flush them to the OS."""
+        try:
+            if self._handle is None:
+                os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+                self._handle = open(self.path, "a")
+            for record in records:
+                self._handle.write(json.dumps(record) + "\n")
+                self.records += 1
+            self._handle.flush()
+        except IOError as e:
+            logger.warning(f"Failed to append to {self.label}: {e}")
+
+    def truncate(self) -> None:
+        """Empty the journal once its records are part of a snapshot. Raises IOError like the snapshot write before it."""
+        self.close()
+        with open(self.path, "w"):
+            pass
+        self.records = 0
+
+    def flush(self) -> None:
+        """Push buffered records to disk."""
+        if self._handle is not None:
+            try:
+                self._handle.flush()
+            except IOError as e:
+                logger.warning(f"Failed to flush {self.label}: {e}")
+
+    def close(self) -> None:
+        """Flush and close the handle; the next append reopens it."""
+        if self._handle is not None:
+            try:
+                self._handle.close()
+            except IOError as e:
+                logger.warning(f"Failed to close {self.label}: {e}")
+            self._handle = None
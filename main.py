@@ -3,6 +3,8 @@
 import sys
 import argparse
 
+from loguru import logger
+
 from settings import settings
 from logger import init_logging
 from discovery import run_discovery
@@ -14,14 +16,25 @@ def main() -> int:
     parser = argparse.ArgumentParser(description="ERR video downloader")
     parser.add_argument("--discover", action="store_true", help="Otsi uusi hooaegade URL-e")
     parser.add_argument("--add", action="store_true", help="Lisa leitud URL-id config.yaml-i (kasuta koos --discover)")
+    parser.add_argument("--all", action="store_true", help="Lae alla ja lisa samas käigus leitud uued hooaegade URL-id config.yaml-i")
+    parser.add_argument("--purge-negative-cache", action="store_true", help="Unusta puuduvaks jäetud sisu (404, meediata, geopiiranguga) enne käivitamist")
     args = parser.parse_args()
 
     init_logging(settings.logger_level, settings.logger_file)
 
+    if args.purge_negative_cache:
+        from err_api import negative_cache
+
+        logger.info(f"Puuduvaks jäetud sisu unustatud: {negative_cache.purge()} ID-d")
+
     if args.discover:
         return run_discovery(settings.tv_shows, args.add)
+    elif settings.threading.engine == "asyncio":
+        from async_engine import run_async_download_mode
+
+        return run_async_download_mode(args.all)
     else:
-        return run_download_mode()
+        return run_download_mode(args.all)
 
 
 if __name__ == "__main__":
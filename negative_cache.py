@@ -0,0 +1,73 @@
+"""Content IDs the ERR API had nothing downloadable for, remembered until a per-reason expiry."""
+
+import os
+import threading
+import time
+from typing import Dict, Optional
+
+from loguru import logger
+
+from state_store import load_state, save_state
+
+# Reasons, with the user-facing wording used in logs
+REMOVED = "removed"  # 404: taken off ERR or archived
+NO_MEDIA = "no_media"  # Page exists but has no medias yet
+GEO_RESTRICTED = "geo_restricted"  # API refused the request from this location (403/451)
+
+REASON_LABELS = {REMOVED: "eemaldatud ERRist", NO_MEDIA: "meediat veel pole", GEO_RESTRICTED: "geopiiranguga"}
+
+
+class NegativeCache:
+    """Remembers why a content ID could not be downloaded, so later runs skip it without an API request.
+
+    Each reason has its own time to live in seconds: removed content rarely comes
+    back, while content without media is usually published within a day. A TTL of
+    0 turns remembering off for that reason.
+    """
+
+    def __init__(self, state_file: str, ttls: Dict[str, float]):
+        self.state_file = os.path.expanduser(state_file)
+        self.ttls = ttls
+        self._entries: Dict[str, Dict] = {}
+        self._lock = threading.Lock()
+        self.load()
+
+    def load(self) -> None:
+        """Load unexpired entries from file."""
+        entries = load_state(self.state_file, "entries", "negative cache")
+        now = time.time()
+        self._entries = {key: entry for key, entry in entries.items() if entry.get("expires_at", 0) > now}
+        if self._entries:
+            logger.debug(f"Loaded {len(self._entries)} remembered missing content IDs from {self.state_file}")
+
+    def save(self) -> None:
+        """Atomically write the entries to file."""
+        save_state(self.state_file, "entries", self._entries, "negative cache")
+
+    def get(self, content_id: int) -> Optional[str]:
+        """Return the remembered reason for a content ID, or None if there is none or it expired."""
+        with self._lock:
+            entry = self._entries.get(str(content_id))
+        if entry is None or entry["expires_at"] <= time.time():
+            return None
+        return entry["reason"]
+
+    def add(self, content_id: int, reason: str) -> None:
+        """Remember a content ID for the TTL of reason."""
+        ttl = self.ttls.get(reason, 0)
+        if ttl <= 0:
+            return
+
+        now = time.time()
+        with self._lock:
+            self._entries[str(content_id)] = {"reason": reason, "seen_at": now, "expires_at": now + ttl}
+            self.save()
+        logger.debug(f"Remembering content_id {content_id} as {reason} for {ttl / 3600:.0f}h")
+
+    def purge(self) -> int:
+        """Forget every entry. Returns how many there were."""
+        with self._lock:
+            count = len(self._entries)
+            self._entries = {}
+            self.save()
+        return count
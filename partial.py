@@ -0,0 +1,121 @@
+"""Partial downloads: data goes to a .part file and is renamed into place once verified."""
+
+import json
+import os
+from typing import Dict, Mapping, Optional, Tuple
+
+from loguru import logger
+
+from integrity import IntegrityError
+from segmented import STATE_SUFFIX, if_range_validator, remove_state
+
+PART_SUFFIX = ".part"
+SIDECAR_SUFFIX = ".json"  # Appended to the .part path
+
+
+def part_path(file_path: str) -> str:
+    """Get the temporary path a download of file_path is written to."""
+    return file_path + PART_SUFFIX
+
+
+def load_sidecar(part_file: str) -> Optional[Dict]:
+    """Load what is known about the remote file behind a .part file ({size, etag, last_modified})."""
+    try:
+        with open(part_file + SIDECAR_SUFFIX, "r") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+    except (json.JSONDecodeError, IOError) as e:
+        logger.warning(f"Ignoring unreadable sidecar of {part_file}: {e}")
+        return None
+
+
+def save_sidecar(part_file: str, size: Optional[int], etag: Optional[str] = None, last_modified: Optional[str] = None) -> None:
+    """Atomically record the expected size and validators of a .part file."""
+    sidecar = part_file + SIDECAR_SUFFIX
+    tmp_file = sidecar + ".tmp"
+    with open(tmp_file, "w") as f:
+        json.dump({"size": size or None, "etag": etag, "last_modified": last_modified}, f)
+    os.replace(tmp_file, sidecar)
+
+
+def partial_size(part_file: str) -> int:
+    """Get how many bytes of a .part file can be resumed from, discarding it if it outgrew the remote file."""
+    try:
+        size = os.path.getsize(part_file)
+    except OSError:
+        return 0
+
+    sidecar = load_sidecar(part_file)
+    if sidecar and sidecar.get("size") and size > sidecar["size"]:
+        logger.warning(f"Partial file is larger than the remote file, discarding: {part_file}")
+        discard(part_file)
+        return 0
+    return size
+
+
+def is_complete(part_file: str, existing_size: int) -> bool:
+    """Check if a .part file already holds every byte (e.g. the run stopped right before the rename)."""
+    if existing_size <= 0 or os.path.exists(part_file + STATE_SUFFIX):
+        return False
+    sidecar = load_sidecar(part_file)
+    return bool(sidecar) and sidecar.get("size") == existing_size
+
+
+def resume_headers(part_file: str, existing_size: int) -> Dict[str, str]:
+    """Build the Range request continuing a .part file.
+
+    If-Range carries the validator of the data already on disk, so a server whose
+    object changed since answers with the whole new file instead of a mismatched tail.
+    """
+    if existing_size <= 0:
+        return {}
+
+    headers = {"Range": f"bytes={existing_size}-"}
+    sidecar = load_sidecar(part_file) or {}
+    validator = if_range_validator(sidecar.get("etag"), sidecar.get("last_modified"))
+    if validator:
+        headers["If-Range"] = validator
+    return headers
+
+
+def accept_response(part_file: str, existing_size: int, status: int, headers: Mapping[str, str]) -> Tuple[int, int]:
+    """Check a media response against the .part file and record it in the sidecar.
+
+    Returns (offset to continue writing at, full size of the remote file or 0 if
+    unknown). Raises IntegrityError, after discarding the partial data, when the
+    remote file no longer has the size the partial data was downloaded for.
+    """
+    if status == 206:
+        content_range = headers.get("Content-Range", "")
+        total = int(content_range.split("/")[-1]) if "/" in content_range else 0
+    else:
+        total = int(headers.get("Content-Length", 0))
+        # Remote file changed since the partial data was fetched, or the server doesn't support resume
+        if existing_size > 0:
+            logger.warning("Server sent the whole file instead of the missing range, starting fresh")
+            existing_size = 0
+
+    sidecar = load_sidecar(part_file)
+    if existing_size > 0 and sidecar and sidecar.get("size") and total and sidecar["size"] != total:
+        discard(part_file)
+        raise IntegrityError(f"Remote file changed size ({sidecar['size']} -> {total}), restarting download")
+
+    save_sidecar(part_file, total, headers.get("ETag"), headers.get("Last-Modified"))
+    return existing_size, total
+
+
+def commit(part_file: str, file_path: str) -> None:
+    """Atomically move a verified .part file to its final name."""
+    os.replace(part_file, file_path)
+    discard(part_file)
+
+
+def discard(part_file: str) -> None:
+    """Delete a .part file together with its sidecar and segment progress."""
+    remove_state(part_file)
+    for path in (part_file, part_file + SIDECAR_SUFFIX):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
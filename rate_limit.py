@@ -0,0 +1,131 @@
+"""Token bucket rate limiting shared by worker threads and coroutines."""
+
+import asyncio
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import Callable, Optional
+
+from loguru import logger
+
+# Responses whose Retry-After header should pause every caller of the limiter
+RETRY_AFTER_STATUSES = (429, 503)
+
+
+class TokenBucket:
+    """Thread-safe token bucket allowing `rate` acquisitions per second with bursts of `burst`.
+
+    Callers reserve a token up front and sleep only for their own share of the debt,
+    so waiting callers are served in arrival order without polling. A rate of 0
+    disables limiting.
+    """
+
+    def __init__(self, rate: float, burst: float = 1):
+        self.rate = rate
+        self.burst = max(burst, 1)
+        self._tokens = self.burst
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def _reserve(self, tokens: float) -> float:
+        """Take tokens from the bucket and return how many seconds to wait before using them."""
+        with self._lock:
+            now = time.monotonic()
+            pause = max(self._paused_until - now, 0.0)
+            if self.rate <= 0:
+                return pause
+
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= tokens
+            debt = -self._tokens / self.rate if self._tokens < 0 else 0.0
+            return max(debt, pause)
+
+    def acquire(self, tokens: float = 1) -> None:
+        """Block the calling thread until tokens are available."""
+        wait = self._reserve(tokens)
+        if wait > 0:
+            time.sleep(wait)
+
+    async def acquire_async(self, tokens: float = 1) -> None:
+        """Wait on the event loop until tokens are available."""
+        wait = self._reserve(tokens)
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+    def pause(self, seconds: float) -> None:
+        """Hold back every caller for the given number of seconds (e.g. from Retry-After)."""
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+    def set_rate(self, rate: float, burst: float) -> None:
+        """Change the rate and burst in place, keeping callers' outstanding debt."""
+        with self._lock:
+            # Leaving unlimited mode starts with a full bucket rather than the stale token count
+            if self.rate <= 0:
+                self._tokens = max(burst, 1)
+                self._updated = time.monotonic()
+            self.rate = rate
+            self.burst = max(burst, 1)
+            self._tokens = min(self._tokens, self.burst)
+
+
+class BandwidthGovernor:
+    """Caps the combined byte rate of all downloads with one shared TokenBucket.
+
+    Every transfer charges the bytes of each chunk after reading it. Reservations
+    are served in arrival order, so concurrent transfers get equal shares. A
+    transfer only sleeps once the shared bucket is in debt, and then for exactly
+    the time it owes, so an unthrottled window costs no sleeps at all. The limit
+    comes from rate_for (e.g. time-of-day profiles) and is re-read every
+    CHECK_INTERVAL seconds.
+    """
+
+    CHECK_INTERVAL = 60.0
+
+    def __init__(self, rate_for: Callable[[], float], burst_seconds: float = 1.0):
+        self.rate_for = rate_for
+        self.burst_seconds = burst_seconds
+        self._bucket = TokenBucket(0)
+        self._checked = -self.CHECK_INTERVAL
+        self._lock = threading.Lock()
+
+    def _refresh(self) -> None:
+        """Apply the current limit if the check interval has passed."""
+        now = time.monotonic()
+        with self._lock:
+            if now - self._checked < self.CHECK_INTERVAL:
+                return
+            self._checked = now
+            rate = self.rate_for()
+            if rate == self._bucket.rate:
+                return
+            self._bucket.set_rate(rate, rate * self.burst_seconds)
+        logger.info(f"Download bandwidth limit: {rate / (1024 * 1024):.1f} MB/s" if rate > 0 else "Download bandwidth limit: unlimited")
+
+    def consume(self, nbytes: int) -> None:
+        """Charge transferred bytes, sleeping the calling thread if the shared limit is exceeded."""
+        self._refresh()
+        self._bucket.acquire(nbytes)
+
+    async def consume_async(self, nbytes: int) -> None:
+        """Charge transferred bytes, waiting on the event loop if the shared limit is exceeded."""
+        self._refresh()
+        await self._bucket.acquire_async(nbytes)
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Parse a Retry-After header given either as seconds or as an HTTP date."""
+    if not value:
+        return None
+
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+
+    try:
+        return max(parsedate_to_datetime(value).timestamp() - time.time(), 0.0)
+    except (TypeError, ValueError):
+        return None
@@ -26,5 +26,4 @@ cd "$APP_DIR" || exit 1
 
 # Activate venv and run (logging handled by Python)
 source venv/bin/activate
-python main.py --discover --add # add new urls to config, in case it found new ones
-python main.py # just run the downloader
+python main.py --all # download and add any newly found season urls to config in the same pass
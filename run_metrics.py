@@ -0,0 +1,156 @@
+"""Per-run latency, throughput and retry metrics, written as a JSON report at the end of a run."""
+
+import bisect
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from loguru import logger
+
+# Upper bounds of the histogram buckets of each metric; le_inf counts every sample
+HISTOGRAM_BOUNDS: Dict[str, List[float]] = {
+    "api_latency_seconds": [0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10],
+    "ttfb_seconds": [0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10],
+    "transfer_mb_per_s": [0.5, 1, 2, 5, 10, 20, 50, 100],
+    "write_seconds": [0.01, 0.1, 0.5, 1, 5, 10, 30, 60],
+}
+
+# Per-episode totals kept next to the histograms, so one slow episode can be traced
+EPISODE_FIELDS = {"api_latency_seconds": "api_seconds", "ttfb_seconds": "ttfb_seconds", "write_seconds": "write_seconds"}
+
+# The episode whose lookup or transfer runs in this thread or task
+current_episode: ContextVar[Optional[int]] = ContextVar("current_episode", default=None)
+
+
+@contextmanager
+def episode_scope(episode_id: int) -> Iterator[None]:
+    """Attribute metrics recorded inside the block to episode_id."""
+    token = current_episode.set(episode_id)
+    try:
+        yield
+    finally:
+        current_episode.reset(token)
+
+
+def summarize(values: List[float], bounds: List[float]) -> Dict[str, Any]:
+    """Describe samples as count, sum, min/max, percentiles and cumulative bucket counts."""
+    if not values:
+        return {"count": 0}
+
+    ordered = sorted(values)
+
+    def percentile(fraction: float) -> float:
+        return round(ordered[min(int(fraction * len(ordered)), len(ordered) - 1)], 4)
+
+    # Cumulative like Prometheus "le" buckets: each counts every sample up to its bound
+    buckets = {f"le_{bound}": bisect.bisect_right(ordered, bound) for bound in bounds}
+    buckets["le_inf"] = len(ordered)
+
+    return {
+        "count": len(ordered),
+        "sum": round(sum(ordered), 4),
+        "min": round(ordered[0], 4),
+        "max": round(ordered[-1], 4),
+        "p50": percentile(0.5),
+        "p90": percentile(0.9),
+        "p99": percentile(0.99),
+        "buckets": buckets,
+    }
+
+
+class RunMetrics:
+    """Samples and counters of one run, safe to record from worker threads and coroutines."""
+
+    def __init__(self):
+        self.started_at = time.time()
+        self._samples: Dict[str, List[float]] = {name: [] for name in HISTOGRAM_BOUNDS}
+        self._counters: Dict[str, int] = {}
+        self._episodes: Dict[str, Dict[str, float]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, name: str, value: float) -> None:
+        """Record a sample of a histogram metric, adding it to the current episode's total where one is kept."""
+        episode_id = current_episode.get()
+        with self._lock:
+            self._samples.setdefault(name, []).append(value)
+            field = EPISODE_FIELDS.get(name)
+            if field and episode_id is not None:
+                episode = self._episodes.setdefault(str(episode_id), {})
+                episode[field] = episode.get(field, 0) + value
+
+    def count(self, name: str, amount: int = 1) -> None:
+        """Increase a run counter, and the current episode's counter of the same name."""
+        episode_id = current_episode.get()
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + amount
+            if episode_id is not None:
+                episode = self._episodes.setdefault(str(episode_id), {})
+                episode[name] = episode.get(name, 0) + amount
+
+    def transfer(self, size: int, seconds: float) -> None:
+        """Record a finished transfer of size bytes in seconds."""
+        if size <= 0 or seconds <= 0:
+            return
+        self.observe("transfer_mb_per_s", size / (1024 * 1024) / seconds)
+        self.count("bytes", size)
+        episode_id = current_episode.get()
+        if episode_id is not None:
+            with self._lock:
+                episode = self._episodes.setdefault(str(episode_id), {})
+                episode["transfer_seconds"] = episode.get("transfer_seconds", 0) + seconds
+
+    def report(self, stats: Dict, extra: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Build the run report from the recorded metrics and the run's outcome statistics."""
+        finished_at = time.time()
+        with self._lock:
+            histograms = {name: summarize(values, HISTOGRAM_BOUNDS.get(name, [])) for name, values in self._samples.items()}
+            counters = dict(self._counters)
+            episodes = {key: dict(values) for key, values in self._episodes.items()}
+
+        for values in episodes.values():
+            if values.get("transfer_seconds") and values.get("bytes"):
+                values["mb_per_s"] = values["bytes"] / (1024 * 1024) / values["transfer_seconds"]
+            for field, value in values.items():
+                if isinstance(value, float):
+                    values[field] = round(value, 4)
+
+        return {
+            "started_at": datetime.fromtimestamp(self.started_at).isoformat(timespec="seconds"),
+            "finished_at": datetime.fromtimestamp(finished_at).isoformat(timespec="seconds"),
+            "duration_seconds": round(finished_at - self.started_at, 3),
+            "outcomes": {key: value for key, value in stats.items() if isinstance(value, int)},
+            "counters": counters,
+            "histograms": histograms,
+            "episodes": episodes,
+            **(extra or {}),
+        }
+
+    def write_report(self, report_file: str, stats: Dict, extra: Optional[Dict[str, Any]] = None) -> None:
+        """Atomically write the run report to report_file."""
+        report_file = os.path.expanduser(report_file)
+        tmp_file = report_file + ".tmp"
+        try:
+            os.makedirs(os.path.dirname(report_file) or ".", exist_ok=True)
+            with open(tmp_file, "w") as f:
+                json.dump(self.report(stats, extra), f, indent=2)
+            os.replace(tmp_file, report_file)
+            logger.info(f"Run report written to {report_file}")
+        except IOError as e:
+            logger.warning(f"Failed to write run report: {e}")
+
+
+run_metrics = RunMetrics()
+
+
+def count_retry(name: str) -> Callable[[Any], None]:
+    """Tenacity before_sleep hook counting retries under retries.<name>."""
+
+    def hook(retry_state: Any) -> None:
+        run_metrics.count(f"retries.{name}")
+
+    return hook
@@ -0,0 +1,158 @@
+"""Segmented download of a single large file over parallel HTTP Range requests."""
+
+import json
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Callable, Dict, List, Optional, Tuple
+
+import requests
+from loguru import logger
+from tqdm import tqdm
+
+STATE_SUFFIX = ".segments.json"
+STATE_SAVE_BYTES = 16 * 1024 * 1024  # Persist segment progress at least this often per segment
+
+
+class RangeNotSupported(Exception):
+    """Server answered a Range request with the whole file (no Range support, or the file changed); use the single-stream path instead."""
+
+
+def if_range_validator(etag: Optional[str], last_modified: Optional[str]) -> Optional[str]:
+    """Pick the If-Range value for a remote file: its strong ETag, else its Last-Modified date."""
+    # Weak ETags are not allowed in If-Range
+    return etag if etag and not etag.startswith("W/") else last_modified
+
+
+def probe_size(session: requests.Session, url: str) -> Tuple[Optional[int], Optional[str], Optional[str]]:
+    """Ask for the first byte. Returns (total size, ETag, Last-Modified); the size is None if the server doesn't support Range requests."""
+    with session.get(url, headers={"Range": "bytes=0-0"}, stream=True, timeout=(10, 30)) as response:
+        response.raise_for_status()
+        etag, last_modified = response.headers.get("ETag"), response.headers.get("Last-Modified")
+        if response.status_code != 206:
+            return None, etag, last_modified
+
+        content_range = response.headers.get("Content-Range", "")
+        total = content_range.split("/")[-1] if "/" in content_range else ""
+        return (int(total) if total.isdigit() else None), etag, last_modified
+
+
+def plan_segments(total: int, count: int) -> List[List[int]]:
+    """Split total bytes into count [start, end, done] ranges (end inclusive)."""
+    size = -(-total // count)
+    return [[start, min(start + size, total) - 1, 0] for start in range(0, total, size)]
+
+
+def load_state(state_path: str, total: int, validator: Optional[str] = None) -> Optional[Dict]:
+    """Load saved segment progress if it belongs to the same remote file (same size and If-Range validator)."""
+    try:
+        with open(state_path, "r") as f:
+            state = json.load(f)
+        if state.get("total") != total:
+            logger.warning(f"Remote size changed ({state.get('total')} -> {total}), restarting segmented download")
+        elif state.get("validator") != validator:
+            logger.warning(f"Remote file changed ({state.get('validator')} -> {validator}), restarting segmented download")
+        else:
+            return state
+    except FileNotFoundError:
+        pass
+    except (json.JSONDecodeError, IOError) as e:
+        logger.warning(f"Ignoring unreadable segment state {state_path}: {e}")
+    return None
+
+
+def save_state(state_path: str, state: Dict) -> None:
+    """Atomically persist segment progress."""
+    tmp_path = state_path + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(state, f)
+    os.replace(tmp_path, state_path)
+
+
+def remove_state(file_path: str) -> None:
+    """Delete the segment progress sidecar of file_path, if any."""
+    try:
+        os.remove(file_path + STATE_SUFFIX)
+    except FileNotFoundError:
+        pass
+
+
+def download_segmented(
+    session: requests.Session,
+    url: str,
+    file_path: str,
+    file_title: str,
+    total: int,
+    segments: int,
+    chunk_size: int,
+    throttle: Optional[Callable[[int], None]] = None,
+    validator: Optional[str] = None,
+) -> bool:
+    """Download url into a preallocated file_path using parallel Range requests.
+
+    Progress of every segment is saved next to the file, so a retry or a later run
+    only fetches the missing ranges. validator (see if_range_validator) is kept
+    with the progress and sent as If-Range, so ranges of a remote file that
+    changed are never stitched to the data already on disk. throttle, if given,
+    is charged with every chunk. Raises RangeNotSupported if the server stops
+    honouring Range requests or the file changed.
+    """
+    state_path = file_path + STATE_SUFFIX
+    state = load_state(state_path, total, validator) if os.path.exists(file_path) else None
+
+    if state is None:
+        state = {"total": total, "validator": validator, "segments": plan_segments(total, segments)}
+        with open(file_path, "wb") as f:
+            f.truncate(total)
+        save_state(state_path, state)
+    else:
+        done = sum(segment[2] for segment in state["segments"])
+        logger.info(f"Resuming segmented download from {done / (1024 * 1024):.1f} MB")
+
+    state_lock = threading.Lock()
+    pending = [segment for segment in state["segments"] if segment[2] < segment[1] - segment[0] + 1]
+    initial = sum(segment[2] for segment in state["segments"])
+
+    def fetch_segment(segment: List[int], pbar: tqdm) -> None:
+        start, end, done = segment
+        headers = {"Range": f"bytes={start + done}-{end}"}
+        if validator:
+            headers["If-Range"] = validator
+        unsaved = 0
+        try:
+            with session.get(url, headers=headers, stream=True, timeout=(10, 30)) as response:
+                response.raise_for_status()
+                if response.status_code != 206:
+                    raise RangeNotSupported(f"Expected 206 for segment {start}-{end}, got {response.status_code} (no Range support or the file changed)")
+
+                with open(file_path, "r+b") as file:
+                    file.seek(start + done)
+                    for chunk in response.iter_content(chunk_size=chunk_size):
+                        if not chunk:
+                            continue
+                        file.write(chunk)
+                        segment[2] += len(chunk)
+                        unsaved += len(chunk)
+                        pbar.update(len(chunk))
+                        if throttle:
+                            throttle(len(chunk))
+                        if unsaved >= STATE_SAVE_BYTES:
+                            file.flush()
+                            with state_lock:
+                                save_state(state_path, state)
+                            unsaved = 0
+        finally:
+            with state_lock:
+                save_state(state_path, state)
+
+        if segment[2] != end - start + 1:
+            raise IOError(f"Segment {start}-{end} ended after {segment[2]} of {end - start + 1} bytes")
+
+    with tqdm(total=total, initial=initial, unit="B", unit_scale=True, desc=file_title) as pbar:
+        with ThreadPoolExecutor(max_workers=max(len(pending), 1)) as executor:
+            futures = [executor.submit(fetch_segment, segment, pbar) for segment in pending]
+            for future in as_completed(futures):
+                future.result()
+
+    remove_state(file_path)
+    return True
@@ -0,0 +1,103 @@
+"""Per-series fingerprints for skipping shows that have not changed since the last run."""
+
+import hashlib
+import os
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Set
+from loguru import logger
+
+from state_store import load_state, save_state
+
+
+def fingerprint(episode_ids: Iterable[int]) -> str:
+    """Hash a series' episode ID list, order-independent."""
+    return hashlib.sha1(",".join(str(i) for i in sorted(episode_ids)).encode()).hexdigest()
+
+
+class SeriesStateStore:
+    """Remembers which episodes of each series were seen and which were left unresolved.
+
+    A series whose episode list hashes the same as last time and has nothing
+    unresolved needs no cache probing at all; otherwise only new or previously
+    unresolved episodes are returned. The episodes of each season are kept too,
+    so lazily listed seasons need not be fetched again to build the list. Every full_check_interval seconds a series is
+    checked in full so files deleted from disk are picked up again.
+    """
+
+    def __init__(self, state_file: str, full_check_interval: float):
+        self.state_file = os.path.expanduser(state_file)
+        self.full_check_interval = full_check_interval
+        self._series: Dict[str, Dict] = {}
+        self._lock = threading.Lock()
+        self.load()
+
+    def load(self) -> None:
+        """Load series state from file."""
+        self._series = load_state(self.state_file, "series", "series state")
+        if self._series:
+            logger.debug(f"Loaded state of {len(self._series)} series from {self.state_file}")
+
+    def save(self) -> None:
+        """Atomically write series state to file."""
+        save_state(self.state_file, "series", self._series, "series state")
+
+    def _needs_full_check(self, entry: Optional[Dict]) -> bool:
+        return entry is None or time.time() - entry.get("last_full_check", 0) >= self.full_check_interval
+
+    def pending(self, series_id: int, episode_ids: List[int]) -> List[int]:
+        """Return the episodes that need a cache check, in API order."""
+        with self._lock:
+            entry = self._series.get(str(series_id))
+
+        if self._needs_full_check(entry):
+            return list(episode_ids)
+
+        unresolved = set(entry.get("unresolved", []))
+        if not unresolved and entry.get("hash") == fingerprint(episode_ids):
+            return []
+
+        known = set(entry.get("ids", []))
+        return [ep_id for ep_id in episode_ids if ep_id not in known or ep_id in unresolved]
+
+    def new_ids(self, series_id: int, episode_ids: List[int]) -> Set[int]:
+        """Return episodes that appeared since the series was last recorded (none for a series seen the first time)."""
+        with self._lock:
+            entry = self._series.get(str(series_id))
+        if entry is None:
+            return set()
+
+        known = set(entry.get("ids", []))
+        return {ep_id for ep_id in episode_ids if ep_id not in known}
+
+    def known_seasons(self, series_id: int) -> Dict[int, List[int]]:
+        """Return the recorded episodes of each season (by first content ID) that need no fresh season lookup.
+
+        Nothing is returned while the series is due a full check, and seasons
+        holding unresolved episodes are left out so they are fetched again.
+        """
+        with self._lock:
+            entry = self._series.get(str(series_id))
+        if self._needs_full_check(entry):
+            return {}
+
+        unresolved = set(entry.get("unresolved", []))
+        return {int(first_id): ids for first_id, ids in entry.get("seasons", {}).items() if not unresolved.intersection(ids)}
+
+    def record(
+        self, series_id: int, episode_ids: List[int], checked_ids: List[int], unresolved_ids: Iterable[int], seasons: Optional[Dict[int, List[int]]] = None
+    ) -> None:
+        """Store the series fingerprint and season episode lists after its pending episodes were processed."""
+        now = time.time()
+        with self._lock:
+            previous = self._series.get(str(series_id))
+            full_check = len(checked_ids) == len(episode_ids)
+            self._series[str(series_id)] = {
+                "hash": fingerprint(episode_ids),
+                "ids": list(episode_ids),
+                "seasons": {str(first_id): ids for first_id, ids in (seasons or {}).items()},
+                "unresolved": sorted(set(unresolved_ids)),
+                "last_seen": now,
+                "last_full_check": now if full_check or previous is None else previous.get("last_full_check", 0),
+            }
+            self.save()
@@ -1,6 +1,7 @@
 """Application settings using pydantic-settings."""
 
 import os
+from datetime import datetime, time
 from pathlib import Path
 from typing import Any, Dict, List, Optional
 
@@ -18,6 +19,15 @@ class DownloadSettings(BaseModel):
     chunk_size: int
     download_all_episodes: bool
     skip_existing: bool
+    expand_seasons: bool = True  # Fetch seasons listed only by firstContentId to get all their episodes
+    segments: int = 1  # Parallel Range requests per file (1 = single stream)
+    segment_min_size: int = 268435456  # Only split files at least this large (bytes)
+    adaptive_chunks: bool = True  # Grow/shrink network reads between chunk_size and max_chunk_size with throughput
+    max_chunk_size: int = 8388608  # Upper bound for adaptive reads (bytes)
+    write_buffer: int = 8388608  # Bytes gathered in memory before each write to disk
+    fadvise: bool = True  # Hint sequential access to the kernel (posix_fadvise, where available)
+    partial_max_age_days: int = 30  # Delete unfinished .part downloads not resumed for this long (0 = keep forever)
+    verify_hash: bool = True  # SHA-256 downloads while they stream and store it in the cache (size is always checked)
 
 
 class ThreadingSettings(BaseModel):
@@ -25,6 +35,12 @@ class ThreadingSettings(BaseModel):
 
     use_threading: bool
     max_workers: Optional[int]
+    max_series_workers: int = 4  # URLs processed concurrently while the download queue is built
+    metadata_workers: int = 2  # Queued episodes resolved (API lookup) in parallel ahead of the max_workers transfers
+    prefetch: int = 8  # Resolved episodes that may wait for a free transfer worker
+    api_workers: int = 4  # Concurrent API lookups inside one series (season expansion)
+    engine: str = "threads"  # "threads" or "asyncio" (requires aiohttp)
+    async_api_concurrency: int = 32  # In-flight API requests on the asyncio engine
 
     def get_max_workers(self) -> int:
         """Get max workers, auto-detecting if not set."""
@@ -38,7 +54,15 @@ class RetrySettings(BaseModel):
     wait_min: int
     wait_max: int
     wait_multiplier: int
-    api_delay: float = 0.3
+    api_delay: float = 0.3  # Used to derive api_rate when it is not set
+    api_rate: Optional[float] = None  # API requests per second across all workers (0 = unlimited)
+    api_burst: int = 3  # Requests allowed back to back before api_rate applies
+
+    def get_api_rate(self) -> float:
+        """Get API requests per second, derived from api_delay if not set."""
+        if self.api_rate is not None:
+            return self.api_rate
+        return 1 / self.api_delay if self.api_delay > 0 else 0
 
 
 class DirectorySettings(BaseModel):
@@ -48,6 +72,70 @@ class DirectorySettings(BaseModel):
     movies: str
 
 
+class CacheSettings(BaseModel):
+    """Download cache settings."""
+
+    backend: str = "json"  # "json" (snapshot + journal) or "sqlite"
+    compact_threshold: int = 500  # Journal records before folding them into the snapshot (json cache and download queue)
+    batch_size: int = 50  # Mutations per committed transaction (sqlite)
+    verify_mode: str = "scan"  # "scan" lists each show folder once, "stat" checks every cached file separately
+    verify_ttl: int = 3600  # Seconds a folder listing is trusted before it is scanned again
+    api_responses: bool = True  # Keep API responses on disk and revalidate them with conditional GETs
+    api_ttl: int = 0  # Seconds a stored API response is used without asking the API (0 = always revalidate)
+    api_dir: Optional[str] = None  # Defaults to an api_cache folder next to cache_file
+    api_max_age_days: int = 30  # Delete stored responses not used for this long (0 = keep forever)
+    series_state: bool = True  # Skip cache checks for series whose episode list is unchanged since the last run
+    series_full_check_hours: int = 168  # Re-check every episode of a series at least this often
+    negative_removed_hours: int = 720  # Skip content IDs that returned 404 for this long (0 = ask the API every run)
+    negative_no_media_hours: int = 24  # Skip content whose page had no media yet for this long
+    negative_geo_hours: int = 168  # Skip content the API refused as geo-restricted (403/451) for this long
+    drm_recheck_days: int = 7  # First re-check of a DRM-protected episode after this long, doubling while it stays protected (0 = never)
+    drm_recheck_max_days: int = 180  # Longest wait between re-checks of one episode
+    drm_recheck_batch: int = 5  # DRM-protected episodes re-checked per run at most
+
+    def get_verify_ttl(self) -> Optional[float]:
+        """Get folder listing TTL, or None when files are verified one by one."""
+        return self.verify_ttl if self.verify_mode == "scan" else None
+
+
+class BandwidthProfile(BaseModel):
+    """Download speed limit for a daily time window."""
+
+    start: time  # "HH:MM", local time
+    end: time  # "HH:MM"; a window ending before it starts runs past midnight
+    max_rate: int  # Bytes per second (0 = unlimited)
+
+    @field_validator("start", "end", mode="before")
+    @classmethod
+    def parse_time_of_day(cls, v):
+        # Unquoted 17:00 reaches us from YAML as the number 1020, which would silently become 00:17
+        if not isinstance(v, str):
+            raise ValueError(f'must be a quoted "HH:MM" time, got {v!r}')
+        return time.fromisoformat(v)
+
+    def contains(self, moment: time) -> bool:
+        """Check if a time of day falls inside this window."""
+        if self.start <= self.end:
+            return self.start <= moment < self.end
+        return moment >= self.start or moment < self.end
+
+
+class BandwidthSettings(BaseModel):
+    """Download bandwidth settings."""
+
+    max_rate: int = 0  # Bytes per second shared by all downloads (0 = unlimited)
+    burst_seconds: float = 1.0  # Seconds of max_rate that may be transferred back to back
+    profiles: List[BandwidthProfile] = []  # Time windows overriding max_rate, first match wins
+
+    def get_max_rate(self, now: Optional[datetime] = None) -> int:
+        """Get the bytes per second limit in effect at the given (or current) local time."""
+        moment = (now or datetime.now()).time()
+        for profile in self.profiles:
+            if profile.contains(moment):
+                return profile.max_rate
+        return self.max_rate
+
+
 class ConstantsSettings(BaseModel):
     """Application constants."""
 
@@ -57,6 +145,7 @@ class ConstantsSettings(BaseModel):
     content_type_tv_shows: str
     content_type_movies: str
     cache_skipped: str
+    negative_cached: str = "negative_cached"  # Skipped because the negative cache remembers the content as missing
 
 
 class Settings(BaseSettings):
@@ -64,7 +153,10 @@ class Settings(BaseSettings):
 
     logger_level: str
     logger_file: Optional[str] = None  # Optional path to log file (e.g., "logs/downloader.log")
+    run_report_file: Optional[str] = None  # JSON metrics of the last run; defaults to run_report.json next to logger_file (or cache_file)
     cache_file: str
+    cache: CacheSettings = CacheSettings()
+    bandwidth: BandwidthSettings = BandwidthSettings()
     download: DownloadSettings
     threading: ThreadingSettings
     retry: RetrySettings
@@ -73,6 +165,16 @@ class Settings(BaseSettings):
     tv_shows: List[str] = []
     movies: List[str] = []
 
+    def get_state_file(self, name: str) -> str:
+        """Get the path of a state file (or folder) kept next to cache_file."""
+        return os.path.join(os.path.dirname(os.path.expanduser(self.cache_file)), name)
+
+    def get_run_report_file(self) -> str:
+        """Get the run report path, derived from logger_file or cache_file if not set."""
+        if self.run_report_file:
+            return self.run_report_file
+        return os.path.join(os.path.dirname(os.path.expanduser(self.logger_file or self.cache_file)), "run_report.json")
+
     @field_validator("tv_shows", "movies", mode="before")
     @classmethod
     def convert_none_to_empty_list(cls, v):
@@ -0,0 +1,243 @@
+"""Local stand-in for the ERR API and CDN, for exercising the download engines without network access.
+
+Serves a small made-up catalogue (a series with an inline and a lazily listed
+season, a DRM-protected episode, an episode without media, a movie and a
+removed ID) from 127.0.0.1, runs one engine against it with all state in a
+temporary folder and checks the result. A second run must find everything in
+the caches, and its run report must count every skip under the right outcome.
+It then interrupts a segmented download, changes the remote file without
+changing its size and checks the resumed file holds none of the old bytes:
+
+    python stand_in.py             # asyncio engine
+    python stand_in.py threads     # thread-based engine
+
+config.yaml is still loaded, but every path and URL list in it is overridden.
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import sys
+import tempfile
+import threading
+from typing import Dict, List, Optional
+
+from aiohttp import web
+
+SERIES_ID = 1001
+SEASONS = {1: [1001, 1002, 1003, 1004], 2: [1101, 1102]}
+DRM_IDS = {1003}
+NO_MEDIA_IDS = {1004}
+MOVIE_ID = 2001
+REMOVED_ID = 9999
+MEDIA_SIZE = 256 * 1024
+
+# Content IDs whose media was replaced on the server, with their current version
+media_versions: Dict[int, int] = {}
+
+
+def media_body(content_id: int, version: int = 0) -> bytes:
+    """Deterministic file content of a content ID; every version has the same size."""
+    return bytes((content_id + version * 7 + i) % 251 for i in range(MEDIA_SIZE))
+
+
+def season_list(active_season: int) -> dict:
+    """seasonList as ERR returns it: the active season with contents, the others by firstContentId only."""
+    items = []
+    for season, ids in SEASONS.items():
+        if season == active_season:
+            contents = [{"id": content_id, "heading": "Stand-in", "season": season, "episode": i + 1} for i, content_id in enumerate(ids)]
+            items.append({"name": str(season), "contents": contents})
+        else:
+            items.append({"name": str(season), "firstContentId": ids[0]})
+    return {"items": items}
+
+
+def content_page(content_id: int, host: str) -> Optional[dict]:
+    """getContentPageData response of a content ID, or None for unknown IDs."""
+    medias = [{"src": {"file": f"//{host}/media/{content_id}.mp4"}, "restrictions": {"drm": content_id in DRM_IDS}}]
+    if content_id in NO_MEDIA_IDS:
+        medias = []
+    if content_id == MOVIE_ID:
+        return {"data": {"mainContent": {"heading": "Stand-in Movie", "statsHeading": "Stand-in Movie", "year": 2020, "medias": medias}}}
+
+    for season, ids in SEASONS.items():
+        if content_id in ids:
+            main_content = {"heading": "Stand-in", "season": season, "episode": ids.index(content_id) + 1, "year": 2021, "medias": medias}
+            return {"data": {"mainContent": main_content, "seasonList": season_list(season)}}
+    return None
+
+
+async def handle_content_page(request: web.Request) -> web.Response:
+    page = content_page(int(request.query.get("contentId", 0)), request.host)
+    if page is None:
+        raise web.HTTPNotFound()
+
+    etag = '"' + hashlib.sha1(repr(page).encode()).hexdigest() + '"'
+    if request.headers.get("If-None-Match") == etag:
+        return web.Response(status=304, headers={"ETag": etag})
+    return web.json_response(page, headers={"ETag": etag})
+
+
+async def handle_media(request: web.Request) -> web.Response:
+    content_id = int(request.match_info["content_id"])
+    version = media_versions.get(content_id, 0)
+    body = media_body(content_id, version)
+    etag = f'"m{content_id}v{version}"'
+    range_header = request.headers.get("Range")
+    if range_header and request.headers.get("If-Range", etag) == etag:
+        start, _, end = range_header.removeprefix("bytes=").partition("-")
+        first, last = int(start), int(end) if end else len(body) - 1
+        headers = {"ETag": etag, "Accept-Ranges": "bytes", "Content-Range": f"bytes {first}-{last}/{len(body)}"}
+        return web.Response(status=206, body=body[first : last + 1], headers=headers, content_type="video/mp4")
+    return web.Response(body=body, headers={"ETag": etag, "Accept-Ranges": "bytes"}, content_type="video/mp4")
+
+
+def start_server() -> str:
+    """Serve the stand-in on a free local port from a background thread. Returns its base URL."""
+    app = web.Application()
+    app.router.add_get("/api/v2/vodContent/getContentPageData", handle_content_page)
+    app.router.add_get("/media/{content_id:\\d+}.mp4", handle_media)
+
+    loop = asyncio.new_event_loop()
+    runner = web.AppRunner(app)
+    loop.run_until_complete(runner.setup())
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    loop.run_until_complete(site.start())
+    port = runner.addresses[0][1]
+    threading.Thread(target=loop.run_forever, daemon=True).start()
+    return f"http://127.0.0.1:{port}"
+
+
+def expected_files(root: str) -> Dict[str, int]:
+    """Paths the engines should produce for the catalogue, with the content ID each holds."""
+    files = {}
+    for season, ids in SEASONS.items():
+        for episode, content_id in enumerate(ids, start=1):
+            if content_id not in DRM_IDS | NO_MEDIA_IDS:
+                files[os.path.join(root, "tv", "Stand-in", f"S{season:02d}E{episode:02d} 2021.mp4")] = content_id
+    files[os.path.join(root, "movies", "Stand-in Movie", "Stand-in Movie 2020.mp4")] = MOVIE_ID
+    return files
+
+
+def check_files(root: str) -> List[str]:
+    """Return a problem description for every expected file that is missing or has the wrong content."""
+    problems = []
+    for path, content_id in expected_files(root).items():
+        if not os.path.exists(path):
+            problems.append(f"missing: {path}")
+        elif open(path, "rb").read() != media_body(content_id):
+            problems.append(f"wrong content: {path}")
+    return problems
+
+
+def check_second_run(root: str) -> List[str]:
+    """Compare the outcome counts in the run report of a run with nothing left to download against the catalogue."""
+    with open(os.path.join(root, "run_report.json"), "r") as f:
+        outcomes = json.load(f)["outcomes"]
+
+    expected = {
+        "successful": 0,
+        "skipped": len(expected_files(root)),
+        "drm_protected": len(DRM_IDS),
+        "negative_cached": len(NO_MEDIA_IDS),
+        "failed": 1,  # The removed ID
+    }
+    return [f"second run counted {outcomes.get(key)} {key}, expected {count}" for key, count in expected.items() if outcomes.get(key) != count]
+
+
+def check_changed_remote(base_url: str, root: str) -> List[str]:
+    """Interrupt a segmented download, replace the remote file with one of the same size and resume it."""
+    import err_api
+    from partial import discard
+    from segmented import RangeNotSupported, download_segmented, if_range_validator, probe_size
+    from settings import settings
+
+    url = f"{base_url}/media/{MOVIE_ID}.mp4"
+    part_file = os.path.join(root, "changed.mp4.part")
+    problems = []
+
+    def interrupt(size: int) -> None:
+        raise IOError("interrupted")
+
+    def start_segments(version: int) -> Optional[str]:
+        """Leave the first chunk of each segment of the given version on disk. Returns its If-Range validator."""
+        media_versions[MOVIE_ID] = version
+        total, etag, last_modified = probe_size(err_api.media_session, url)
+        validator = if_range_validator(etag, last_modified)
+        try:
+            download_segmented(err_api.media_session, url, part_file, "changed", total, 2, 16 * 1024, interrupt, validator)
+        except IOError:
+            pass
+        return validator
+
+    # Changed before the next run: the probe sees a new validator and the segments start over
+    start_segments(1)
+    media_versions[MOVIE_ID] = 2
+    settings.download.segments = 2
+    settings.download.segment_min_size = 0
+    err_api.download_file(url, part_file, "changed")
+    if open(part_file, "rb").read() != media_body(MOVIE_ID, 2):
+        problems.append("segmented resume mixed old and new bytes after the remote file changed between runs")
+    discard(part_file)
+
+    # Changed between the probe and the segment requests: If-Range makes the server send the whole file
+    validator = start_segments(3)
+    media_versions[MOVIE_ID] = 4
+    try:
+        download_segmented(err_api.media_session, url, part_file, "changed", MEDIA_SIZE, 2, 16 * 1024, None, validator)
+        problems.append("segmented resume accepted ranges of a changed remote file")
+    except RangeNotSupported:
+        pass
+    discard(part_file)
+
+    media_versions.pop(MOVIE_ID, None)
+    return problems
+
+
+def main() -> int:
+    engine = sys.argv[1] if len(sys.argv) > 1 else "asyncio"
+    root = tempfile.mkdtemp(prefix="err-stand-in-")
+    base_url = start_server()
+
+    # Singletons in err_api and downloader read these at import time
+    from settings import settings
+
+    settings.logger_file = None
+    settings.run_report_file = os.path.join(root, "run_report.json")
+    settings.cache_file = os.path.join(root, "cache.json")
+    settings.cache.api_dir = None
+    settings.directories.tv_shows = os.path.join(root, "tv")
+    settings.directories.movies = os.path.join(root, "movies")
+    settings.threading.engine = engine
+    settings.download.download_all_episodes = True
+    settings.retry.wait_min = settings.retry.wait_max = 0
+    settings.bandwidth.max_rate = 0
+    settings.bandwidth.profiles = []
+    settings.tv_shows = [f"https://lasteekraan.err.ee/{SERIES_ID}/stand-in", f"https://lasteekraan.err.ee/{REMOVED_ID}/removed"]
+    settings.movies = [f"https://lasteekraan.err.ee/{MOVIE_ID}/stand-in-movie"]
+
+    import err_api
+
+    err_api.API_BASE_URL = base_url + "/api/v2/vodContent/getContentPageData?contentId={}"
+    # Real media URLs are protocol-relative and always fetched over https
+    err_api.extract_mp4_url = lambda medias: "http:" + medias[0]["src"]["file"]
+
+    if engine == "asyncio":
+        from async_engine import run_async_download_mode as run_engine
+    else:
+        from downloader import run_download_mode as run_engine
+
+    exit_code = run_engine()
+    problems = check_files(root)
+    exit_code = exit_code or run_engine()
+    problems += check_second_run(root) + check_changed_remote(base_url, root)
+    for problem in problems:
+        print(problem)
+    print(f"{engine}: {'OK' if exit_code == 0 and not problems else 'FAILED'} ({root})")
+    return 1 if exit_code or problems else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,34 @@
+"""Loading and atomically saving the small JSON state files kept next to the cache."""
+
+import json
+import os
+from typing import Any, Dict
+
+from loguru import logger
+
+
+def load_state(state_file: str, key: str, label: str) -> Dict[str, Any]:
+    """Return the map stored under key in a state file, or an empty one if the file is missing or unreadable."""
+    if not os.path.exists(state_file):
+        return {}
+
+    try:
+        with open(state_file, "r") as f:
+            return json.load(f).get(key, {})
+    except (json.JSONDecodeError, IOError) as e:
+        logger.warning(f"Failed to load {label}: {e}")
+        return {}
+
+
+def save_state(state_file: str, key: str, data: Dict[str, Any], label: str) -> bool:
+    """Atomically write data under key to a state file. Returns False if it could not be written."""
+    tmp_file = state_file + ".tmp"
+    try:
+        os.makedirs(os.path.dirname(state_file) or ".", exist_ok=True)
+        with open(tmp_file, "w") as f:
+            json.dump({key: data}, f)
+        os.replace(tmp_file, state_file)
+        return True
+    except IOError as e:
+        logger.warning(f"Failed to save {label}: {e}")
+        return False
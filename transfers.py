@@ -0,0 +1,85 @@
+"""Registry of unfinished downloads, so partial data survives failed retries and later runs."""
+
+import os
+import threading
+import time
+from typing import Dict
+
+from loguru import logger
+
+from partial import SIDECAR_SUFFIX, discard
+from segmented import STATE_SUFFIX
+from state_store import load_state, save_state
+
+
+class TransferRegistry:
+    """Remembers the .part file of every unfinished episode download.
+
+    Keyed by episode ID rather than file name, so a partial download is picked up
+    again even when the episode title (and with it the file name) or the signed
+    media URL changed between runs. Whether the remote object itself changed is
+    decided by the If-Range validators kept in the part's sidecar. Entries not
+    touched for max_age seconds are dropped together with their data.
+    """
+
+    def __init__(self, state_file: str, max_age: float = 0):
+        self.state_file = os.path.expanduser(state_file)
+        self.max_age = max_age
+        self._transfers: Dict[str, Dict] = {}
+        self._lock = threading.Lock()
+        self.load()
+
+    def load(self) -> None:
+        """Load the registry from file and drop expired entries."""
+        self._transfers = load_state(self.state_file, "transfers", "transfer registry")
+        if self._transfers:
+            logger.debug(f"Loaded {len(self._transfers)} unfinished downloads from {self.state_file}")
+        self.prune()
+
+    def save(self) -> None:
+        """Atomically write the registry to file."""
+        save_state(self.state_file, "transfers", self._transfers, "transfer registry")
+
+    def prune(self) -> None:
+        """Delete partial downloads that have not been resumed for max_age seconds."""
+        if self.max_age <= 0:
+            return
+
+        now = time.time()
+        with self._lock:
+            expired = {key: entry for key, entry in self._transfers.items() if now - entry.get("updated_at", 0) >= self.max_age}
+            for key, entry in expired.items():
+                logger.info(f"Discarding stale partial download of episode {key}: {entry.get('part')}")
+                discard(entry["part"])
+                del self._transfers[key]
+            if expired:
+                self.save()
+
+    def adopt(self, episode_id: int, part_file: str) -> None:
+        """Move an earlier partial download of the episode to part_file if its name changed since."""
+        with self._lock:
+            entry = self._transfers.get(str(episode_id))
+        old_part = entry.get("part") if entry else None
+        if not old_part or old_part == part_file or not os.path.exists(old_part) or os.path.exists(part_file):
+            return
+
+        try:
+            os.makedirs(os.path.dirname(part_file) or ".", exist_ok=True)
+            for suffix in ("", SIDECAR_SUFFIX, STATE_SUFFIX):
+                if os.path.exists(old_part + suffix):
+                    os.replace(old_part + suffix, part_file + suffix)
+            logger.info(f"Resuming partial download of episode {episode_id} from {old_part}")
+        except OSError as e:
+            logger.warning(f"Failed to move partial download {old_part}: {e}")
+
+    def record(self, episode_id: int, part_file: str, url: str) -> None:
+        """Remember an unfinished download after its retries ran out."""
+        with self._lock:
+            self._transfers[str(episode_id)] = {"part": part_file, "url": url, "updated_at": time.time()}
+            self.save()
+
+    def remove(self, episode_id: int) -> None:
+        """Forget a download once it completed."""
+        with self._lock:
+            if self._transfers.pop(str(episode_id), None) is not None:
+                self.save()